@@ -5,7 +5,17 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import platformdirs as pfd
+
+from ._async_processor import AsyncProcessor as AsyncProcessor
+from ._capture import Capture as Capture
+from ._pool import ProcessorPool as ProcessorPool
 from ._processor import Processor as Processor
+from ._retention import Retention as Retention
+from ._sim_processor import SimProcessor as SimProcessor
+from ._stats import JsonlExporter as JsonlExporter
+from ._stats import PrometheusExporter as PrometheusExporter
+from ._stats import Stats as Stats
+from ._stats import StatsSnapshot as StatsSnapshot
 
 platform_dir = pfd.PlatformDirs(appname="neuro_fpga", appauthor=False, roaming=False)
 build_path = platform_dir.user_cache_path
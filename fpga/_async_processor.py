@@ -0,0 +1,333 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import array
+import asyncio
+import fcntl
+import os
+import termios
+from time import perf_counter
+from typing import AsyncIterator
+
+import neuro
+import numpy as np
+from periphery import Serial
+
+from fpga._capture import CaptureKind
+from fpga._processor import (
+    BAUDS_PER_BYTE,
+    RESPONSE_TIMEOUT_SECS,
+    DispatchOpcode,
+    IoType,
+    Processor,
+)
+from fpga.network import spike_array
+from fpga.transport import Transport
+
+
+class AsyncProcessor(Processor):
+    """``fpga.Processor`` whose blocking methods are coroutines on an event loop.
+
+    Serial I/O waits for the port's file descriptor to be ready on the running loop
+    rather than in threads, so one event loop can drive several targets at once.
+    The descriptor is switched to non-blocking mode for this. Only synthesis and
+    programming run in threads. Output queries such as ``output_vector()`` are
+    unchanged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._subscribers = []
+        self._num_published = {}
+        super().__init__(*args, **kwargs)
+        if self._interface.fd is not None:
+            os.set_blocking(self._interface.fd, False)
+
+    async def apply_spike(self, spike: neuro.Spike) -> None:
+        if self._programmed is False:
+            raise RuntimeError(
+                "Cannot apply spikes before programming the target FPGA."
+            )
+
+        if spike.time < 0:
+            raise RuntimeError("Spikes cannot be scheduled in the past.")
+        self._inp.queue.append(int(spike.time) + self._inp.time, spike.id, spike.value)
+        if int(spike.time) == 0:
+            await self._write(self._pkts_now().tobytes())
+
+    async def apply_spikes(self, spikes: list[neuro.Spike]) -> None:
+        await self.apply_spike_arrays(spike_array(spikes))
+
+    async def apply_spike_arrays(
+        self,
+        ids: np.ndarray,
+        times: np.ndarray | None = None,
+        values: np.ndarray | None = None,
+    ) -> None:
+        if self._programmed is False:
+            raise RuntimeError(
+                "Cannot apply spikes before programming the target FPGA."
+            )
+
+        times, idxs, vals = self._desc.spikes(ids, times, values)
+        self._inp.queue.extend(times + self._inp.time, idxs, vals)
+        if np.any(times == 0):
+            await self._write(self._pkts_now().tobytes())
+
+    async def clear(self) -> None:
+        if self._network:
+            await self.clear_activity()
+        self._network = None
+        self._programmed = False
+
+    async def clear_activity(self) -> None:
+        if self._programmed is False:
+            raise RuntimeError(
+                "Cannot clear network activity before programming the target FPGA."
+            )
+
+        if self._capture is not None:
+            self._capture._record(CaptureKind.CLR)
+        if self._inp.type == IoType.DISPATCH:
+            clr = self._inp.cmd_fmt.pack({"opcode": DispatchOpcode.CLR, "operand": 0})
+            await self._write(clr[::-1])
+        await self._flush()
+        match (self._inp.type, self._out.type):
+            case (IoType.DISPATCH, IoType.DISPATCH):
+                await self._rx(self._max_run, True, asyncio.Condition())
+            case _:
+                await self._drain()
+                self._out.pending.clear()
+
+        self._clear_io()
+        # only a DIDO target answers a CLR right away, the next run checks others
+        self._out.clr_owed = not self._inp.type == self._out.type == IoType.DISPATCH
+        self._num_published = {}
+
+    async def load_network(
+        self, net: neuro.Network, should_program: bool = True, backend=None
+    ) -> None:
+        self._check_auto_io(should_program)
+        await self.clear()
+        self._network = net
+        self._setup_io()
+        if backend is None:
+            # synthesis takes minutes, so keep the loop running meanwhile
+            backend = await asyncio.to_thread(self._build_network)
+        self._backend = backend
+        if should_program:
+            if not isinstance(self._interface, (Serial, Transport)):
+                raise RuntimeError(
+                    "Cannot program network onto FPGA without a valid serial interface."
+                )
+
+            # emulated targets have no bitstream to program
+            if backend is not None:
+                await asyncio.to_thread(backend.run)
+            self._programmed = True
+            # hardware will sometimes send CLR on startup
+            if backend is not None:
+                await self._ready(False, 1.0)
+            await self._drain()
+            await self.clear_activity()
+
+    async def outputs(self) -> AsyncIterator[tuple[int, float]]:
+        """Yield ``(out_idx, time)`` for every output fire as it is received.
+
+        Times are relative to the start of the run they occurred in, as with
+        ``output_vector()``. Fires are yielded across runs until the caller stops.
+        """
+        fires = asyncio.Queue()
+        self._subscribers.append(fires)
+        try:
+            while True:
+                yield await fires.get()
+        finally:
+            self._subscribers.remove(fires)
+
+    async def run(self, time: int) -> None:
+        if self._programmed is False:
+            raise RuntimeError("Cannot run before programming the target FPGA.")
+
+        if time < 1:
+            raise ValueError("It's not possible to run for less than 1 timestep")
+        target_time = self._inp.time + time
+        self._mark_run(self._inp.time)
+        if self._stats is not None:
+            self._stats._begin_run()
+        if self._capture is not None:
+            self._capture._run(target_time, time)
+        spikes = self._inp.queue.pop_before(target_time)
+        await self._run_io(target_time, *self._encode(*spikes, target_time, True))
+        if self._stats is not None:
+            self._stats._end_run(time)
+
+    async def run_episodes(
+        self, episodes: list[list[neuro.Spike] | np.ndarray], time: int
+    ) -> list[list[list[float]]]:
+        if self._stats is not None:
+            self._stats._begin_run()
+        pkts, runs = self._encode_episodes(episodes, time)
+        begin = self._inp.time
+        target_time = begin + len(episodes) * time
+        if self._capture is not None:
+            self._capture._run(target_time, len(episodes) * time, True)
+        # fires are yielded relative to the first episode until the last is done
+        self._mark_run(begin)
+        self._out.in_episodes = True
+        try:
+            await self._run_io(target_time, pkts, runs)
+        finally:
+            self._out.in_episodes = False
+        outputs = self._split_episodes(begin, len(episodes), time)
+        self._mark_run(target_time - time)
+        if self._stats is not None:
+            self._stats._end_run(len(episodes) * time)
+        return outputs
+
+    async def _run_io(self, target: int, pkts: np.ndarray, runs: np.ndarray) -> None:
+        # a failure of either direction cancels the other and is raised
+        self._out.expect(target)
+        progress = asyncio.Condition()
+        tasks = [
+            asyncio.create_task(self._tx(pkts, runs, progress)),
+            asyncio.create_task(self._rx(target, False, progress)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _tx(
+        self, pkts: np.ndarray, runs: np.ndarray, progress: asyncio.Condition
+    ) -> None:
+        start = self._inp.time
+        # chunks of the packets are written from views into them
+        pkts = np.ascontiguousarray(pkts)
+        ran = np.cumsum(runs)
+        sent = 0
+        while sent < len(pkts):
+            wait_start = perf_counter()
+            async with progress:
+                while (chunk := self._tx_chunk(pkts, ran, start, sent))[1] == sent:
+                    try:
+                        await asyncio.wait_for(progress.wait(), RESPONSE_TIMEOUT_SECS)
+                    except asyncio.TimeoutError:
+                        raise RuntimeError("Target stopped taking input.")
+            if self._stats is not None:
+                self._stats.credit_wait_secs += perf_counter() - wait_start
+            tx, end = chunk
+            await self._writev(tx)
+            self._inp.time = start + int(ran[end - 1])
+            sent = end
+            async with progress:
+                progress.notify_all()
+
+    async def _rx(
+        self, target: int, seek_clr: bool, progress: asyncio.Condition
+    ) -> None:
+        self._settled = False
+        while True:
+            done = self._rx_decode(target, seek_clr)
+            if not seek_clr:
+                self._publish()
+            async with progress:
+                progress.notify_all()
+                if done:
+                    self._settled = True
+                    return
+                await progress.wait_for(lambda: self._rx_owed(target, seek_clr))
+            # wait for one whole packet, but take everything already waiting
+            need = self._out.spk_layout.num_bytes - len(self._out.pending)
+            start = perf_counter()
+            if not await self._ready(False, RESPONSE_TIMEOUT_SECS):
+                raise RuntimeError("Did not receive coherent response from target.")
+            rx = self._interface.read(max(need, self._interface.input_waiting()), 0)
+            self._out.pending.extend(rx)
+            self._bytes_received += len(rx)
+            if self._stats is not None:
+                self._stats.read_wait_secs += perf_counter() - start
+                self._stats.bytes_received += len(rx)
+            if self._capture is not None:
+                self._capture._record(CaptureKind.RX, rx)
+
+    async def _drain(self) -> None:
+        quiet, limit = self._drain_limits()
+        drained = 0
+        while self._interface.input_waiting() or await self._ready(False, quiet):
+            drained += len(self._interface.read(self._interface.input_waiting(), 0))
+            if drained > limit:
+                raise RuntimeError("Target did not stop sending while drained.")
+        self._settled = True
+
+    async def _write(self, data: bytes) -> None:
+        await self._writev([data])
+
+    async def _writev(self, buffers: list[bytes | np.ndarray]) -> None:
+        start = perf_counter()
+        views = [memoryview(buffer).cast("B") for buffer in buffers]
+        num_bytes = sum(len(view) for view in views)
+        while views:
+            await self._ready(True)
+            try:
+                num_written = os.writev(self._interface.fd, views)
+            except BlockingIOError:
+                continue
+            while views and num_written >= len(views[0]):
+                num_written -= len(views.pop(0))
+            if views:
+                views[0] = views[0][num_written:]
+        self._bytes_sent += num_bytes
+        if self._stats is not None:
+            self._stats.write_secs += perf_counter() - start
+            self._count_sent(num_bytes)
+        if self._capture is not None:
+            self._capture._record(CaptureKind.TX, b"".join(map(bytes, buffers)))
+
+    async def _flush(self) -> None:
+        # wait for a UART to send what it holds as tcdrain() would, but on the loop
+        fd = self._interface.fd
+        if fd is None or not os.isatty(fd):
+            return
+        queued = array.array("i", [0])
+        while True:
+            fcntl.ioctl(fd, termios.TIOCOUTQ, queued, True)
+            if not queued[0]:
+                return
+            await asyncio.sleep(queued[0] * BAUDS_PER_BYTE / self._baudrate)
+
+    async def _ready(self, writable: bool, timeout: float | None = None) -> bool:
+        # wait for the serial port to be readable or writable on the running loop
+        loop = asyncio.get_running_loop()
+        if writable:
+            add_watcher, remove_watcher = loop.add_writer, loop.remove_writer
+        else:
+            add_watcher, remove_watcher = loop.add_reader, loop.remove_reader
+        ready = loop.create_future()
+        fd = self._interface.fd
+        if fd is None:
+            raise RuntimeError("Cannot wait on an interface without a file descriptor.")
+        add_watcher(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            remove_watcher(fd)
+
+    def _publish(self) -> None:
+        # hand fires decoded since the last call to every outputs() iterator
+        fires = []
+        queue = self._out.queue
+        for out_idx in range(len(queue)):
+            times = queue.history(out_idx)
+            published = self._num_published.get(out_idx, 0) - queue.dropped[out_idx]
+            fires.extend((t, out_idx) for t in times[max(0, published) :].tolist())
+            self._num_published[out_idx] = queue.dropped[out_idx] + len(times)
+        fires.sort()
+        for fires_queue in self._subscribers:
+            for t, out_idx in fires:
+                fires_queue.put_nowait((out_idx, float(t - self._last_run)))
@@ -0,0 +1,98 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import os
+import pathlib as pl
+from enum import IntEnum
+from threading import Lock
+from time import monotonic_ns
+
+import neuro
+import numpy as np
+
+from fpga.network import HASH_LEN, hash_network
+
+# bytes of a chunk carried by each record, which pads records to 64 bytes
+RECORD_DATA_BYTES = 54
+
+# one record of a capture, which can be read back with np.memmap
+CAPTURE_DTYPE = np.dtype(
+    [
+        ("time", "<u8"),
+        ("kind", "u1"),
+        ("size", "u1"),
+        ("data", "u1", RECORD_DATA_BYTES),
+    ]
+)
+
+# target time, timesteps and whether it runs episodes
+RUN_DTYPE = np.dtype([("target", "<i8"), ("timesteps", "<i8"), ("episodes", "u1")])
+
+
+class CaptureKind(IntEnum):
+    # I/O type and network hash of a newly loaded network
+    HEADER = 0
+    TX = 1
+    RX = 2
+    # start of a run, as a RUN_DTYPE record
+    RUN = 3
+    # start of clearing network activity
+    CLR = 4
+
+
+class Capture:
+    """Records the bytes a processor moves to an append-only file at ``path``.
+
+    Every chunk written or decoded is stored with a monotonic timestamp in
+    nanoseconds as records of ``CAPTURE_DTYPE``, split across several if it is
+    long, along with the start of every run and clear. Bytes discarded while
+    draining the target are not captured. ``fpga.replay.replay_capture()`` plays
+    a capture back.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = pl.Path(path)
+        self._file = open(self.path, "ab")
+        # the sending and receiving threads record concurrently
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _header(self, io_type: str, net: neuro.Network) -> None:
+        self._record(
+            CaptureKind.HEADER, (io_type + hash_network(net, HASH_LEN)).encode()
+        )
+
+    def _run(self, target: int, timesteps: int, episodes: bool = False) -> None:
+        run = np.array((target, timesteps, episodes), dtype=RUN_DTYPE)
+        self._record(CaptureKind.RUN, run.tobytes())
+        # everything before a run is on disk once it starts
+        with self._lock:
+            self._file.flush()
+
+    def _record(self, kind: CaptureKind, data: bytes = b"") -> None:
+        num_records = max(1, -(-len(data) // RECORD_DATA_BYTES))
+        records = np.zeros(num_records, dtype=CAPTURE_DTYPE)
+        records["time"] = monotonic_ns()
+        records["kind"] = kind
+        padded = np.zeros(num_records * RECORD_DATA_BYTES, dtype=np.uint8)
+        padded[: len(data)] = np.frombuffer(data, dtype=np.uint8)
+        records["data"] = padded.reshape(num_records, RECORD_DATA_BYTES)
+        records["size"] = RECORD_DATA_BYTES
+        records["size"][-1] = len(data) - (num_records - 1) * RECORD_DATA_BYTES
+        with self._lock:
+            self._file.write(records.tobytes())
+
+
+def read_capture(path: str | os.PathLike) -> np.ndarray:
+    """Map the records of a capture written by ``fpga.Capture`` into memory."""
+    return np.memmap(path, dtype=CAPTURE_DTYPE, mode="r")
@@ -0,0 +1,87 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import bitstruct as bs
+import numpy as np
+
+from fpga._math import width_bits_to_bytes
+
+
+class PacketLayout:
+    """Bit layout of a compiled ``bitstruct`` format for packing with NumPy.
+
+    Packets are handled as rows of a ``uint8`` array holding the bytes in wire
+    order, i.e. the reverse of what ``fmt.pack()`` returns.
+    """
+
+    def __init__(self, fmt: bs.CompiledFormatDict):
+        self.num_bits = fmt.calcsize()
+        self.num_bytes = width_bits_to_bytes(self.num_bits)
+        self._fields = {}
+        self._signed = {}
+        offset = 0
+        for info in fmt._infos:
+            self._fields[info.name] = (offset, info.size)
+            self._signed[info.name] = isinstance(info, bs._SignedInteger)
+            offset += info.size
+
+    def pack(self, num_pkts: int, fields: dict) -> np.ndarray:
+        """Pack ``num_pkts`` packets from arrays (or scalars) of field values.
+
+        A 2-D array of shape ``(num_pkts, k)`` fills the ``k`` consecutive fields of
+        equal width starting at its name. Fields which are not given are zero and
+        fields absent from the format are ignored.
+        """
+        bits = np.zeros((num_pkts, 8 * self.num_bytes), dtype=np.uint8)
+        for name, vals in fields.items():
+            # bitstruct formats leave out zero-width fields
+            if name not in self._fields:
+                continue
+            offset, width = self._fields[name]
+            vals = np.asarray(vals, dtype=np.int64)
+            num_fields = vals.shape[1] if vals.ndim == 2 else 1
+            shifts = np.arange(width - 1, -1, -1, dtype=np.int64)
+            # two's complement falls out of shifting the sign in
+            field_bits = (vals[..., None] >> shifts) & 1
+            bits[:, offset : offset + num_fields * width] = field_bits.reshape(
+                len(vals) if vals.ndim else 1, num_fields * width
+            )
+        return np.packbits(bits, axis=1)[:, ::-1]
+
+    def unpack(self, pkts: np.ndarray) -> dict:
+        """Unpack rows of packets of at most 64 bits into arrays of field values."""
+        if self.num_bytes > 8:
+            raise ValueError("Only packets of up to 64 bits can be unpacked at once.")
+        pkts = np.ascontiguousarray(pkts, dtype=np.uint8)
+        vals = np.zeros(len(pkts), dtype=np.uint64)
+        for i in range(self.num_bytes):
+            vals |= pkts[:, i].astype(np.uint64) << np.uint64(8 * i)
+        fields = {}
+        for name, (offset, width) in self._fields.items():
+            shift = np.uint64(8 * self.num_bytes - offset - width)
+            field = ((vals >> shift) & np.uint64((1 << width) - 1)).astype(np.int64)
+            if self._signed[name]:
+                field[field >= 1 << (width - 1)] -= 1 << width
+            fields[name] = field
+        return fields
+
+    def unpack_fields(
+        self, pkts: np.ndarray, name: str | int, num_fields: int = 1
+    ) -> np.ndarray:
+        """Unpack ``num_fields`` consecutive fields of equal width starting at
+        ``name`` from rows of packets of any size, as a 2-D array of values.
+
+        This is the inverse of packing a 2-D array of values in ``pack()``.
+        """
+        pkts = np.asarray(pkts, dtype=np.uint8)
+        offset, width = self._fields[name]
+        bits = np.unpackbits(pkts[:, ::-1], axis=1)[
+            :, offset : offset + num_fields * width
+        ].reshape(len(pkts), num_fields, width)
+        weights = np.int64(1) << np.arange(width - 1, -1, -1, dtype=np.int64)
+        vals = bits.astype(np.int64) @ weights
+        if self._signed[name]:
+            vals[vals >= 1 << (width - 1)] -= 1 << width
+        return vals
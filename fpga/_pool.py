@@ -0,0 +1,117 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+from collections import deque
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import ThreadPoolExecutor as PoolExecutor
+from concurrent.futures import wait
+from threading import Lock
+
+import neuro
+import numpy as np
+from periphery import Serial
+
+from fpga._processor import Processor
+
+
+class ProcessorPool:
+    """Identical targets which evaluate episodes of one network in parallel.
+
+    Each target is driven by its own ``fpga.Processor`` on a thread of its own.
+    Episodes are dealt out in batches, and a target which runs out of batches
+    steals them from the back of the longest queue left.
+
+    Retention policies, stats and captures belong to one target each, so they
+    cannot be given to a pool. Only one target of a pool can be programmed with a
+    bitstream, as the EDA tools program whichever board they find first.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        interfaces: list[Serial | str],
+        io_type: str = "DISO",
+        *args,
+        **kwargs,
+    ):
+        if not interfaces:
+            raise ValueError("A processor pool needs at least one interface.")
+        shared = [key for key in ("retention", "stats", "capture") if key in kwargs]
+        if shared:
+            raise ValueError(
+                f"A processor pool cannot share {', '.join(shared)} between targets."
+            )
+        self.processors = [
+            Processor(target, interface, io_type, *args, **kwargs)
+            for interface in interfaces
+        ]
+
+    def __len__(self) -> int:
+        return len(self.processors)
+
+    def clear(self) -> None:
+        for proc in self.processors:
+            proc.clear()
+
+    def load_network(self, net: neuro.Network, should_program: bool = True) -> None:
+        """Load a network onto every target from a single EDA build.
+
+        Programming is refused for a pool of more than one target with a bitstream.
+        """
+        first, *rest = self.processors
+        if should_program and rest and first._target_config["default_tool"] is not None:
+            raise RuntimeError(
+                "Cannot program more than one board, as the EDA tool cannot choose"
+                + " which board it programs."
+            )
+        first.load_network(net, should_program)
+        for proc in rest:
+            proc.load_network(net, should_program, first._backend)
+
+    def run_episodes(
+        self,
+        episodes: list[list[neuro.Spike] | np.ndarray],
+        time: int,
+        batch_size: int | None = None,
+    ) -> list[list[list[float]]]:
+        """Run each episode on a cleared network as in ``Processor.run_episodes()``.
+
+        Outputs are returned in the order of the episodes, whichever target ran
+        them. Batches of ``batch_size`` episodes are streamed to a target at once,
+        which defaults to an eighth of each target's share.
+        """
+        if batch_size is None:
+            batch_size = max(1, len(episodes) // (8 * len(self.processors)))
+        starts = list(range(0, len(episodes), batch_size))
+        # each target starts with a contiguous share of the batches
+        shares = np.array_split(np.array(starts, dtype=np.int64), len(self.processors))
+        queues = [deque(share.tolist()) for share in shares]
+        lock = Lock()
+        outputs = [None] * len(episodes)
+
+        def next_batch(i: int) -> int | None:
+            with lock:
+                if queues[i]:
+                    return queues[i].popleft()
+                victim = max(queues, key=len)
+                return victim.pop() if victim else None
+
+        def work(i: int) -> None:
+            while (start := next_batch(i)) is not None:
+                stop = min(start + batch_size, len(episodes))
+                outputs[start:stop] = self.processors[i].run_episodes(
+                    episodes[start:stop], time
+                )
+
+        with PoolExecutor(len(self.processors)) as executor:
+            futures = [executor.submit(work, i) for i in range(len(self.processors))]
+            wait(futures, return_when=FIRST_EXCEPTION)
+            # stop the other targets from taking more work after a failure
+            with lock:
+                for queue in queues:
+                    queue.clear()
+        for future in futures:
+            future.result()
+        return outputs
@@ -7,56 +7,204 @@ import os.path
 import pathlib as pl
 import sys
 from enum import Enum, IntEnum, auto
-from heapq import heapify, heappop, heappush
 from importlib import resources
 from json import load
-from threading import Thread
-from time import sleep
-from typing import Iterable
+from threading import Condition, Thread
+from time import perf_counter
 
 import bitstruct as bs
 import neuro
+import numpy as np
 from edalize.edatool import get_edatool
 from periphery import Serial
 
 import fpga
 from fpga import config, rtl
-from fpga._math import unsigned_width, width_bits_to_bytes, width_nearest_byte
+from fpga._capture import Capture, CaptureKind
+from fpga._math import unsigned_width, width_nearest_byte
+from fpga._packets import PacketLayout
+from fpga._retention import MIN_SEGMENT_FIRES, Retention
+from fpga._stats import Stats
 from fpga.network import (
     HASH_LEN,
+    NetworkDescriptor,
     build_network_sv,
-    charge_width,
     hash_network,
     proc_name,
-    spike_value_factor,
+    spike_array,
 )
-
-SYSTEM_BUFFER = 4096
+from fpga.transport import Transport, open_transport
 
 if not sys.version_info.major == 3 and sys.version_info.minor >= 6:
     raise RuntimeError("Python 3.6 or newer is required.")
 
+# UART 8N1 spends 10 bauds on every byte
+BAUDS_PER_BYTE = 10
+# longest a UART may go quiet while still sending, e.g. for the latency timer of
+# USB serial adapters
+DRAIN_QUIET_SECS = 0.02
+# longest to wait on a target which owes output before giving up on it
+RESPONSE_TIMEOUT_SECS = 10.0
+
+
+class _InpQueue:
+    """Spikes waiting to be sent as arrays of times, input indices and charges.
+
+    Spikes are kept sorted by timestep, and in the order they were applied within
+    one. Newly applied spikes are gathered up and merged in with a single stable
+    sort the next time any are taken.
+    """
+
+    def __init__(self, desc: NetworkDescriptor):
+        self._desc = desc
+        self._times = np.empty(0, dtype=np.int64)
+        self._idxs = np.empty(0, dtype=np.int64)
+        self._vals = np.empty(0, dtype=np.int64)
+        self._chunks = []
+        # single spikes as times, input indices and charges
+        self._singles = ([], [], [])
+
+    def __len__(self) -> int:
+        return (
+            len(self._times)
+            + sum(len(chunk[0]) for chunk in self._chunks)
+            + len(self._singles[0])
+        )
 
-# we're hacking Spike to support comparison
-neuro.Spike.__lt__ = lambda self, other: self.time < other.time
-neuro.Spike.__le__ = lambda self, other: self.time <= other.time
-neuro.Spike.__gt__ = lambda self, other: self.time > other.time
-neuro.Spike.__ge__ = lambda self, other: self.time >= other.time
-
-
-class _InpQueue(list):
-    def __init__(self, data: Iterable[neuro.Spike]):
-        super().__init__(data)
-        heapify(self)
-
-    def append(self, item: neuro.Spike) -> None:
-        heappush(self, item)
-
-    def extend(self, iterable: Iterable[neuro.Spike]) -> None:
-        [self.append(item) for item in iterable]
+    def append(self, time: int, node_id: int, value: float) -> None:
+        if not 0 <= node_id < len(self._desc.input_idxs) or (
+            self._desc.input_idxs[node_id] < 0
+        ):
+            raise ValueError("Cannot send spikes to non-input node.")
+        # quantized up front so that a value which does not fit is never queued
+        charge = int(self._desc.charges([value])[0])
+        self._singles[0].append(time)
+        self._singles[1].append(int(self._desc.input_idxs[node_id]))
+        self._singles[2].append(charge)
+
+    def extend(self, times: np.ndarray, idxs: np.ndarray, vals: np.ndarray) -> None:
+        self._flush_singles()
+        self._chunks.append((times, idxs, vals))
+
+    def pop_before(self, stop: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Take every spike before timestep ``stop`` in order."""
+        self._merge()
+        end = np.searchsorted(self._times, stop)
+        popped = self._times[:end], self._idxs[:end], self._vals[:end]
+        self._times = self._times[end:]
+        self._idxs = self._idxs[end:]
+        self._vals = self._vals[end:]
+        return popped
+
+    def _flush_singles(self) -> None:
+        # keep single spikes in order with the chunks applied around them
+        if self._singles[0]:
+            self._chunks.append(
+                tuple(np.array(field, dtype=np.int64) for field in self._singles)
+            )
+            self._singles = ([], [], [])
+
+    def _merge(self) -> None:
+        self._flush_singles()
+        if not self._chunks:
+            return
+        times, idxs, vals = (
+            np.concatenate([field, *(chunk[i] for chunk in self._chunks)])
+            for i, field in enumerate([self._times, self._idxs, self._vals])
+        )
+        self._chunks = []
+        order = np.argsort(times, kind="stable")
+        self._times, self._idxs, self._vals = times[order], idxs[order], vals[order]
+
+
+class _OutQueue:
+    """Fire timesteps of each output in growable arrays, in the order received.
+
+    The offsets of the latest run into each array are kept so that its fires can
+    be counted and sliced without scanning the history.
+    """
+
+    def __init__(self, num_outputs: int):
+        self._times = [np.empty(16, dtype=np.int64) for _ in range(num_outputs)]
+        self.lens = np.zeros(num_outputs, dtype=np.int64)
+        self.offsets = np.zeros(num_outputs, dtype=np.int64)
+        # fires let go of so far by trim()
+        self.dropped = np.zeros(num_outputs, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def append(self, out_idx: int, time: int) -> None:
+        self._reserve(out_idx, 1)
+        self._times[out_idx][self.lens[out_idx]] = time
+        self.lens[out_idx] += 1
+
+    def extend(self, out_idx: int, times: np.ndarray) -> None:
+        self._reserve(out_idx, len(times))
+        size = self.lens[out_idx]
+        self._times[out_idx][size : size + len(times)] = times
+        self.lens[out_idx] += len(times)
+
+    def add(self, times: np.ndarray, idxs: np.ndarray) -> None:
+        """Append fires given as parallel arrays, each output's in time order."""
+        order = np.argsort(idxs, kind="stable")
+        bounds = np.searchsorted(idxs[order], np.arange(len(self) + 1))
+        for out_idx in np.flatnonzero(np.diff(bounds)):
+            fires = order[bounds[out_idx] : bounds[out_idx + 1]]
+            self.extend(int(out_idx), times[fires])
+
+    def mark(self, start: int) -> None:
+        """Start the latest run at the first fire at or after ``start``."""
+        for out_idx in range(len(self)):
+            self.offsets[out_idx] = np.searchsorted(self.history(out_idx), start)
+
+    def count_before(self, cutoff: int) -> int:
+        return sum(
+            int(np.searchsorted(self.history(out_idx), cutoff))
+            for out_idx in range(len(self))
+        )
 
-    def popleft(self) -> neuro.Spike:
-        return heappop(self)
+    def trim(self, cutoff: int) -> tuple[np.ndarray, np.ndarray]:
+        """Let go of every fire before ``cutoff``, returning their times and outputs.
+
+        The fires kept are moved to new arrays, so views already handed out still
+        hold the fires they did.
+        """
+        times = []
+        idxs = []
+        for out_idx in range(len(self)):
+            num_fires = int(np.searchsorted(self.history(out_idx), cutoff))
+            arr = self._times[out_idx]
+            times.append(arr[:num_fires].copy())
+            idxs.append(np.full(num_fires, out_idx, dtype=np.int64))
+            if num_fires:
+                num_kept = self.lens[out_idx] - num_fires
+                self._times[out_idx] = np.empty(max(16, 2 * num_kept), dtype=np.int64)
+                self._times[out_idx][:num_kept] = arr[num_fires : self.lens[out_idx]]
+            self.lens[out_idx] -= num_fires
+            self.offsets[out_idx] = max(0, self.offsets[out_idx] - num_fires)
+            self.dropped[out_idx] += num_fires
+        return np.concatenate(times), np.concatenate(idxs)
+
+    def history(self, out_idx: int) -> np.ndarray:
+        """Read-only view of every fire of an output still held."""
+        return self._view(out_idx, 0)
+
+    def latest(self, out_idx: int) -> np.ndarray:
+        """Read-only view of the fires of an output in the latest run."""
+        return self._view(out_idx, self.offsets[out_idx])
+
+    def _view(self, out_idx: int, offset: int) -> np.ndarray:
+        view = self._times[out_idx][offset : self.lens[out_idx]]
+        view.flags.writeable = False
+        return view
+
+    def _reserve(self, out_idx: int, num_fires: int) -> None:
+        size = self.lens[out_idx] + num_fires
+        times = self._times[out_idx]
+        if size > len(times):
+            self._times[out_idx] = np.empty(max(size, 2 * len(times)), dtype=np.int64)
+            self._times[out_idx][: self.lens[out_idx]] = times[: self.lens[out_idx]]
 
 
 class IoType(Enum):
@@ -91,10 +239,10 @@ class _IoConfig:
     def __init__(
         self,
         io_type: IoType,
-        net: neuro.Network,
+        desc: NetworkDescriptor,
         is_axi: bool = True,
     ):
-        self._network = net
+        self._desc = desc
         self.type = io_type
         match self.type:
             case IoType.DISPATCH:
@@ -135,71 +283,419 @@ class _IoConfig:
 
 
 class InpConfig(_IoConfig):
+    def __init__(self, io_type: IoType, desc: NetworkDescriptor, is_axi: bool = True):
+        super().__init__(io_type, desc, is_axi)
+        self.spk_layout = PacketLayout(self.spk_fmt)
+        if self.type == IoType.DISPATCH:
+            self.cmd_layout = PacketLayout(self.cmd_fmt)
+            # written on its own after chunks of packets, so kept contiguous
+            self.snc_pkt = np.ascontiguousarray(
+                self.cmd_layout.pack(1, {"opcode": DispatchOpcode.SNC})
+            )
+            self.clr_pkt = self.cmd_layout.pack(1, {"opcode": DispatchOpcode.CLR})
+        self.num_encoded = 0
+        self.encode_secs = 0.0
 
     def clear(self):
         super().clear()
-        self.queue = _InpQueue([])
+        self.queue = _InpQueue(self._desc)
+
+    def encode(
+        self,
+        times: np.ndarray,
+        idxs: np.ndarray,
+        vals: np.ndarray,
+        target: int,
+        max_run: int,
+        sync: bool = False,
+        clear: bool = False,
+        begin: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Encode every packet from ``begin`` (the current time) up to ``target``.
+
+        Spikes are given as parallel arrays of absolute times within that span,
+        input indices and quantized values, where the last spike to an input at a
+        time wins. The network is cleared first if ``clear`` is set. Returns the
+        packets as rows of bytes in wire order along with the timesteps each one
+        runs.
+        """
+        start = perf_counter()
+        begin = self.time if begin is None else begin
+        times = np.asarray(times, dtype=np.int64)
+        idxs = np.asarray(idxs, dtype=np.int64)
+        vals = np.asarray(vals, dtype=np.int64)
+        # keep the final occurrence of each (time, input) pair, ordered by both
+        keys = (times - begin) * self._num_net_io() + idxs
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(times) - 1 - last
+        times, idxs, vals = times[last], idxs[last], vals[last]
+
+        match self.type:
+            case IoType.DISPATCH:
+                pkts, runs = self._encode_dispatch(
+                    times, idxs, vals, begin, target, max_run, sync, clear
+                )
+            case IoType.STREAM:
+                pkts, runs = self._encode_stream(
+                    times, idxs, vals, begin, target, sync, clear
+                )
+            case _:
+                raise ValueError()
+
+        self.num_encoded += len(pkts)
+        self.encode_secs += perf_counter() - start
+        return pkts, runs
+
+    def _encode_dispatch(
+        self,
+        times: np.ndarray,
+        idxs: np.ndarray,
+        vals: np.ndarray,
+        begin: int,
+        target: int,
+        max_run: int,
+        sync: bool,
+        clear: bool,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # each distinct spike time (and the start) sends its spikes, then runs
+        # until the next one in RUN packets of at most max_run
+        steps, num_spks = np.unique(times, return_counts=True)
+        if not len(steps) or steps[0] != begin:
+            steps = np.insert(steps, 0, begin)
+            num_spks = np.insert(num_spks, 0, 0)
+        span = np.diff(np.append(steps, max(target, begin)))
+        num_runs = -(-span // max_run)
+        num_pkts = num_spks + num_runs
+        firsts = np.cumsum(num_pkts) - num_pkts + int(clear)
+        total = int(num_pkts.sum()) + int(sync) + int(clear)
+
+        pkts = np.empty((total, self.cmd_layout.num_bytes), dtype=np.uint8)
+        runs = np.zeros(total, dtype=np.int64)
+
+        spk_rows = np.repeat(firsts - np.cumsum(num_spks) + num_spks, num_spks)
+        spk_rows += np.arange(len(times))
+        pkts[spk_rows] = self.spk_layout.pack(
+            len(times), {"opcode": DispatchOpcode.SPK, "idx": idxs, "val": vals}
+        )
+
+        run_seg = np.repeat(np.arange(len(steps)), num_runs)
+        run_nth = np.arange(len(run_seg)) - np.repeat(
+            np.cumsum(num_runs) - num_runs, num_runs
+        )
+        run_rows = firsts[run_seg] + num_spks[run_seg] + run_nth
+        runs[run_rows] = np.minimum(span[run_seg] - run_nth * max_run, max_run)
+        pkts[run_rows] = self.cmd_layout.pack(
+            len(run_rows), {"opcode": DispatchOpcode.RUN, "operand": runs[run_rows]}
+        )
+
+        if clear:
+            pkts[0] = self.clr_pkt[0]
+        if sync:
+            pkts[-1] = self.snc_pkt[0]
+        return pkts, runs
+
+    def _encode_stream(
+        self,
+        times: np.ndarray,
+        idxs: np.ndarray,
+        vals: np.ndarray,
+        begin: int,
+        target: int,
+        sync: bool,
+        clear: bool,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if target <= begin:
+            raise RuntimeError("Cannot send spikes to stream source without running.")
+        num_steps = target - begin
+        raster = np.zeros((num_steps, self._num_net_io()), dtype=np.int64)
+        raster[times - begin, idxs] = vals
+        snc = np.zeros(num_steps, dtype=bool)
+        snc[-1] = sync
+        clr = np.zeros(num_steps, dtype=bool)
+        clr[0] = clear or begin == 0
+        fields = {StreamFlag.SNC.name: snc, StreamFlag.CLR.name: clr}
+        if self._num_net_io():
+            fields[0] = raster
+        return self.spk_layout.pack(num_steps, fields), np.ones(
+            num_steps, dtype=np.int64
+        )
 
     def _num_net_io(self):
-        return self._network.num_inputs()
+        return self._desc.num_inputs
 
     def _charge_width(self):
         # TODO: support fires input
-        return charge_width(self._network)
+        return self._desc.charge_width
 
 
 class OutConfig(_IoConfig):
+    def __init__(self, io_type: IoType, desc: NetworkDescriptor, is_axi: bool = True):
+        super().__init__(io_type, desc, is_axi)
+        self.spk_layout = PacketLayout(self.spk_fmt)
+        if self.type == IoType.DISPATCH:
+            self.cmd_layout = PacketLayout(self.cmd_fmt)
+        # received bytes not yet decoded, which may end in a partial packet
+        self.pending = bytearray()
+        # whether a CLR starts the next episode rather than resetting the time
+        self.in_episodes = False
+        # whether the next output must acknowledge a CLR sent without a reply
+        self.clr_owed = False
 
     def clear(self):
         super().clear()
-        self.queue = {out: [] for out in range(self._network.num_outputs())}
+        self.queue = _OutQueue(self._desc.num_outputs)
+        # timesteps known to have run whose RUN has not been received yet
+        self.held = 0
+        # stream sinks also fill a row per timestep of the run being received
+        self.raster = None
+        self.raster_start = 0
+
+    def expect(self, target: int) -> None:
+        """Make room for the raster of a run ending at ``target``."""
+        if self.type == IoType.STREAM:
+            self.raster = np.zeros((target - self.time, self._desc.num_outputs), bool)
+            self.raster_start = self.time
+
+    def decode(
+        self, pkts: np.ndarray, target: int, inp_type: IoType, seek_clr: bool = False
+    ) -> tuple[int, bool]:
+        """Apply received packets in order until the end of a run (or a CLR).
+
+        Returns the number of packets consumed and whether the run has ended.
+        """
+        match self.type:
+            case IoType.DISPATCH:
+                return self._decode_dispatch(pkts, target, inp_type, seek_clr)
+            case IoType.STREAM:
+                return self._decode_stream(pkts, target, inp_type)
+            case _:
+                raise ValueError()
+
+    def _decode_dispatch(
+        self, pkts: np.ndarray, target: int, inp_type: IoType, seek_clr: bool
+    ) -> tuple[int, bool]:
+        fields = self.cmd_layout.unpack(pkts)
+        opcodes = fields["opcode"]
+        operands = fields["operand"]
+        ends = np.flatnonzero(
+            (opcodes == DispatchOpcode.SNC) | (opcodes == DispatchOpcode.CLR)
+        )
+
+        # packets are unpacked once, then applied up to each SNC or CLR in turn
+        first = 0
+        for end in ends.tolist() + [len(pkts)]:
+            # RUN and SPK packets between them are applied in bulk
+            ran = np.where(
+                opcodes[first:end] == DispatchOpcode.RUN, operands[first:end], 0
+            )
+            times = self.time + np.cumsum(ran)
+            is_spk = opcodes[first:end] == DispatchOpcode.SPK
+            if np.any(is_spk):
+                spk_times = times[is_spk]
+                # single-output networks have no index field
+                idxs = self.spk_layout.unpack(pkts[first:end][is_spk]).get(
+                    "idx", np.zeros(len(spk_times), dtype=np.int64)
+                )
+                self.queue.add(spk_times, idxs)
+            self.time += int(ran.sum())
+            if np.any(ran):
+                self.held = 0
+
+            if end == len(pkts):
+                return end, False
+            first = end + 1
+            match opcodes[end]:
+                case DispatchOpcode.SNC:
+                    if self.clr_owed:
+                        raise RuntimeError("Target did not acknowledge CLR.")
+                    # a streamed SNC rides on a timestep whose RUN is reported later
+                    self.held = int(inp_type == IoType.STREAM)
+                    # the host also syncs partway through a run to be credited back
+                    if self.time + self.held == target or seek_clr:
+                        return first, True
+                case DispatchOpcode.CLR:
+                    self.clr_owed = False
+                    if seek_clr:
+                        return first, True
+                    elif self.in_episodes:
+                        continue
+                    elif self.time and inp_type == IoType.DISPATCH:
+                        raise RuntimeError("Should not have received CLR during run()")
+                    self.clear()
+                case _:
+                    raise ValueError()
+
+    def _decode_stream(
+        self, pkts: np.ndarray, target: int, inp_type: IoType
+    ) -> tuple[int, bool]:
+        # every packet runs one timestep, so the whole run is decoded at once
+        pkts = pkts[: target - self.time]
+        layout = self.spk_layout
+        snc = layout.unpack_fields(pkts, StreamFlag.SNC.name)[:, 0].astype(bool)
+        clr = layout.unpack_fields(pkts, StreamFlag.CLR.name)[:, 0].astype(bool)
+        times = self.time + np.arange(len(pkts))
+
+        # the stream sink flags the first packet after a CLR
+        if self.clr_owed and len(pkts):
+            if not clr[0]:
+                raise RuntimeError("Target did not acknowledge CLR.")
+            self.clr_owed = False
+        if not self.in_episodes and np.any(clr & (times != 0)):
+            raise RuntimeError("Should not have received CLR during run()")
+        # don't check DISO because SNC can't travel back in time
+        if inp_type == IoType.STREAM:
+            wrong = np.flatnonzero(snc != (times + 1 == target))
+            if len(wrong):
+                raise RuntimeError(
+                    f"SNC flag {bool(snc[wrong[0]])}"
+                    f" does NOT match timing {times[wrong[0]] + 1}/{target}"
+                )
+
+        if self._desc.num_outputs:
+            fired = layout.unpack_fields(pkts, 0, self._desc.num_outputs) != 0
+            if self.raster is not None:
+                row = self.time - self.raster_start
+                self.raster[row : row + len(pkts)] = fired
+            steps, idxs = np.nonzero(fired)
+            self.queue.add(times[steps], idxs)
+        self.time += len(pkts)
+        return len(pkts), self.time == target
 
     def _num_net_io(self):
-        return self._network.num_outputs()
+        return self._desc.num_outputs
 
     def _charge_width(cls):
         # TODO: support charges output
         return 0
 
 
+def target_config(target: str) -> dict:
+    """Entry of a target in the targets config file."""
+    with open(resources.files(config).joinpath("targets.json")) as f:
+        return load(f)[target]
+
+
+def comm_limits(inp: InpConfig, out: OutConfig, uart: dict) -> tuple[int, int]:
+    """Flow control limits of a UART target with the given I/O configs.
+
+    Returns the number of input packets which may be in flight without overflowing
+    the FPGA's receive buffer, along with the longest run a single packet may ask
+    for. Output needs no credit of its own, as the sink stalls the network while
+    its UART is busy, leaving the input to back up.
+    """
+    max_pkts_ahead = max(2, uart["buffer_rx"] // inp.spk_layout.num_bytes)
+    match inp.type:
+        case IoType.DISPATCH:
+            # limited only by the command field width
+            max_run = 2 ** (inp.cmd_fmt._infos[1].size) - 1
+        case IoType.STREAM:
+            # every packet runs one timestep
+            max_run = 1
+        case _:
+            raise ValueError()
+    return max_pkts_ahead, max_run
+
+
 class Processor(neuro.Processor):
     def __init__(
         self,
         target: str,
-        interface: Serial | str | None = None,
+        interface: Serial | Transport | str | None = None,
         io_type: str = "DISO",
         *args,
+        retention: Retention | None = None,
+        stats: Stats | None = None,
+        capture: Capture | None = None,
+        workload: dict | None = None,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
 
         self._target_name = target
 
-        with open(resources.files(config).joinpath("targets.json")) as f:
-            self._target_config = load(f)[self._target_name]
-
-        if interface is None or isinstance(interface, str):
-            baudrate = 115200
-            try:
-                baudrate = self._target_config["parameters"]["uart"]["baud_rates"][-1]
-            except KeyError:
-                pass
-            except IndexError:
-                pass
-            if isinstance(interface, str):
-                interface = Serial(interface, baudrate)
-        elif isinstance(interface, Serial):
-            baudrate = interface.baudrate
-        else:
-            raise RuntimeError("fpga Processor interface must be a periphery.Serial or str or None object.")
+        self._target_config = target_config(self._target_name)
+
+        baudrate = 115200
+        try:
+            baudrate = self._target_config["parameters"]["uart"]["baud_rates"][-1]
+        except KeyError:
+            pass
+        except IndexError:
+            pass
+        if isinstance(interface, str):
+            interface = open_transport(interface, baudrate)
+        elif isinstance(interface, (Serial, Transport)):
+            # transports which are not UARTs need not know their baud rate
+            baudrate = interface.baudrate or baudrate
+        elif interface is not None:
+            raise RuntimeError(
+                "fpga Processor interface must be a periphery.Serial or"
+                + " fpga.transport.Transport or str or None object."
+            )
         self._interface = interface
         self._baudrate = baudrate
 
         self._io_type = io_type.upper()
+        # the I/O type is chosen for each network as it is loaded
+        self._auto_io = self._io_type == "AUTO"
+        if workload is not None and not self._auto_io:
+            raise ValueError('A workload only informs io_type="auto".')
+        # keyword arguments of fpga.link.predict_links() describing the traffic
+        self._workload = {} if workload is None else workload
 
         self._network = None
+        self._backend = None
         self._programmed = False
-        self.clear()
+        # signalled whenever input is sent or output is received during a run
+        self._progress = Condition()
+        self._retention = Retention() if retention is None else retention
+        # number of times activity has been cleared, which restarts output times
+        self._epoch = 0
+        self._bytes_sent = 0
+        self._bytes_received = 0
+        # whether all output owed by the target is known to have been received
+        self._settled = False
+        # whatever stopped the receiving thread of the last run
+        self._rx_error = None
+        self._stats = stats
+        self._capture = capture
+
+    @property
+    def io_type(self) -> str:
+        """I/O type of the processor, which ``"auto"`` resolves on loading a network."""
+        return self._io_type
+
+    @property
+    def encode_rate(self) -> float:
+        """Input packets encoded per second spent encoding them since loading."""
+        if self._network is None or not self._inp.encode_secs:
+            return 0.0
+        return self._inp.num_encoded / self._inp.encode_secs
+
+    @property
+    def bytes_sent(self) -> int:
+        """Bytes written to the target since the processor was created."""
+        return self._bytes_sent
+
+    @property
+    def bytes_received(self) -> int:
+        """Bytes of output packets read from the target since it was created."""
+        return self._bytes_received
+
+    @property
+    def epoch(self) -> int:
+        """Number of times network activity has been cleared, which restarts time."""
+        return self._epoch
+
+    @property
+    def capture(self) -> Capture | None:
+        """Recorder of the bytes moved, if the processor was given one."""
+        return self._capture
+
+    @property
+    def stats(self) -> Stats | None:
+        """I/O counters given to the processor, if any."""
+        return self._stats
 
     def apply_spike(self, spike: neuro.Spike) -> None:
         if self._programmed is False:
@@ -207,18 +703,34 @@ class Processor(neuro.Processor):
 
         if spike.time < 0:
             raise RuntimeError("Spikes cannot be scheduled in the past.")
-        self._inp.queue.append(
-            neuro.Spike(spike.id, spike.time + self._inp.time, spike.value)
-        )
-        if self._inp.type == IoType.DISPATCH:
-            spikes_now = []
-            while self._inp.queue and self._inp.queue[0].time == self._inp.time:
-                # send these spikes as soon as they arrive to reduce latency
-                spikes_now.append(self._inp.queue.popleft())
-            self._hw_tx(spikes_now, 0, False)
+        self._inp.queue.append(int(spike.time) + self._inp.time, spike.id, spike.value)
+        if int(spike.time) == 0:
+            self._write(self._pkts_now().tobytes())
 
     def apply_spikes(self, spikes: list[neuro.Spike]) -> None:
-        [self.apply_spike(spike) for spike in spikes]
+        self.apply_spike_arrays(spike_array(spikes))
+
+    def apply_spike_arrays(
+        self,
+        ids: np.ndarray,
+        times: np.ndarray | None = None,
+        values: np.ndarray | None = None,
+    ) -> None:
+        """Apply spikes given as arrays, without any ``neuro.Spike`` objects.
+
+        ``ids``, ``times`` and ``values`` are parallel arrays (or scalars) as in
+        ``neuro.Spike``, or ``ids`` alone is a structured array with the fields of
+        ``fpga.network.SPIKE_DTYPE``.
+        """
+        if self._programmed is False:
+            raise RuntimeError(
+                "Cannot apply spikes before programming the target FPGA."
+            )
+
+        times, idxs, vals = self._desc.spikes(ids, times, values)
+        self._inp.queue.extend(times + self._inp.time, idxs, vals)
+        if np.any(times == 0):
+            self._write(self._pkts_now().tobytes())
 
     def clear(self) -> None:
         if self._network:
@@ -230,8 +742,10 @@ class Processor(neuro.Processor):
         if self._programmed is False:
             raise RuntimeError("Cannot clear network activity before programming the target FPGA.")
 
+        if self._capture is not None:
+            self._capture._record(CaptureKind.CLR)
         if self._inp.type == IoType.DISPATCH:
-            self._interface.write(
+            self._write(
                 self._inp.cmd_fmt.pack(
                     {
                         "opcode": DispatchOpcode.CLR,
@@ -244,30 +758,78 @@ class Processor(neuro.Processor):
             case (IoType.DISPATCH, IoType.DISPATCH):
                 self._hw_rx(self._max_run, True)
             case _:
-                while self._interface.poll(1):
-                    self._interface.read(self._interface.input_waiting())
+                self._drain()
+                self._out.pending.clear()
 
-        self._inp.clear()
-        self._out.clear()
+        self._clear_io()
+        # Only a DIDO target answers a CLR right away, which was awaited above.
+        # A stream source only sends its CLR with the next timestep, and a stream
+        # sink flags the packet of that timestep, so the next run checks those.
+        self._out.clr_owed = not self._inp.type == self._out.type == IoType.DISPATCH
+
+    def load_network(
+        self, net: neuro.Network, should_program: bool = True, backend=None
+    ) -> None:
+        """Build a network for the target and program it.
 
-    def load_network(self, net: neuro.Network, should_program: bool = True) -> None:
+        An EDA ``backend`` already built for the same network, target and I/O type,
+        such as by another processor, is programmed without building it again.
+        """
+        self._check_auto_io(should_program)
         self.clear()
         self._network = net
         self._setup_io()
-        backend = self._build_network()
+        if backend is None:
+            backend = self._build_network()
+        self._backend = backend
         if should_program:
-            if not isinstance(self._interface, Serial):
-                raise RuntimeError("Cannot program network onto FPGA without a valid serial interface.")
+            self._program(backend)
 
-            backend.run()
-            self._programmed = True
-            # hardware will sometimes send CLR on startup
-            while self._interface.poll(1):
-                self._interface.read(self._interface.input_waiting())
-            self.clear_activity()
+    def output_array(self, out_idx: int) -> np.ndarray:
+        """Timesteps since the last clear at which an output fired in the last run.
+
+        This is a read-only view of the output store rather than a copy.
+        """
+        if self._programmed is False:
+            raise RuntimeError(
+                "Cannot get output array before programming the target FPGA."
+            )
+
+        return self._out.queue.latest(out_idx)
+
+    def output_history(
+        self,
+        out_idx: int,
+        start: int = 0,
+        stop: int | None = None,
+        epoch: int | None = None,
+    ) -> np.ndarray:
+        """Timesteps since the last clear at which an output fired in a window.
+
+        Fires which the retention policy has spilled to disk are loaded as needed,
+        while those it has dropped without spilling are missing. With a spill
+        directory, clearing activity spills every fire still held, so the history
+        of an earlier ``epoch``, as counted by the property of that name, can be
+        read as well.
+        """
+        if self._programmed is False:
+            raise RuntimeError(
+                "Cannot get output history before programming the target FPGA."
+            )
+
+        if epoch is None:
+            epoch = self._epoch
+        held = self._out.queue.history(out_idx)
+        if epoch != self._epoch:
+            held = held[:0]
+        begin = np.searchsorted(held, start)
+        end = len(held) if stop is None else np.searchsorted(held, stop)
+        return np.concatenate(
+            self._retention.spilled(epoch, out_idx, start, stop) + [held[begin:end]]
+        )
 
     def output_count(self, out_idx: int) -> int:
-        return len(self.output_vector(out_idx))
+        return len(self.output_array(out_idx))
 
     def output_counts(self) -> list[int]:
         return [
@@ -275,8 +837,8 @@ class Processor(neuro.Processor):
         ]
 
     def output_last_fire(self, out_idx: int) -> float:
-        outs = self.output_vector(out_idx)
-        return outs[-1] if outs else -1
+        outs = self.output_array(out_idx)
+        return float(outs[-1] - self._last_run) if len(outs) else -1
 
     def output_last_fires(self) -> list[float]:
         return [
@@ -288,9 +850,7 @@ class Processor(neuro.Processor):
         if self._programmed is False:
             raise RuntimeError("Cannot get output vector before programming the target FPGA.")
 
-        return [
-            t - self._last_run for t in self._out.queue[out_idx] if t >= self._last_run
-        ]
+        return (self._out.queue.latest(out_idx) - float(self._last_run)).tolist()
 
     def output_vectors(self) -> list[list[float]]:
         return [
@@ -298,6 +858,31 @@ class Processor(neuro.Processor):
             for out_idx in range(self._network.num_outputs())
         ]
 
+    def output_raster(self) -> np.ndarray:
+        """Whether each output fired in each timestep of the last run.
+
+        Row ``t`` of the boolean array holds the fires ``t`` timesteps into the
+        run, as ``output_vectors()`` times them.
+        """
+        if self._programmed is False:
+            raise RuntimeError(
+                "Cannot get output raster before programming the target FPGA."
+            )
+
+        out = self._out
+        if out.raster is not None and out.raster_start <= self._last_run:
+            # stream sinks decoded the run straight into a raster
+            view = out.raster[self._last_run - out.raster_start :]
+            view.flags.writeable = False
+            return view
+
+        queue = out.queue
+        num_steps = max(0, self._inp.time - self._last_run)
+        raster = np.zeros((num_steps, len(queue)), dtype=bool)
+        for out_idx in range(len(queue)):
+            raster[queue.latest(out_idx) - self._last_run, out_idx] = True
+        return raster
+
     def run(self, time: int) -> None:
         if self._programmed is False:
             raise RuntimeError("Cannot run before programming the target FPGA.")
@@ -305,177 +890,332 @@ class Processor(neuro.Processor):
         if time < 1:
             raise ValueError("It's not possible to run for less than 1 timestep")
         target_time = self._inp.time + time
-        rx_thread = Thread(target=self._hw_rx, args=(target_time,))
+        self._mark_run(self._inp.time)
+        if self._stats is not None:
+            self._stats._begin_run()
+        if self._capture is not None:
+            self._capture._run(target_time, time)
+        spikes = self._inp.queue.pop_before(target_time)
+        self._hw_run(target_time, *self._encode(*spikes, target_time, True))
+        if self._stats is not None:
+            self._stats._end_run(time)
+
+    def run_episodes(
+        self, episodes: list[list[neuro.Spike] | np.ndarray], time: int
+    ) -> list[list[list[float]]]:
+        """Run each list of spikes on a freshly cleared network for ``time`` steps.
+
+        The episodes are streamed back-to-back with a CLR between each, so the
+        next episode is sent while outputs of the last are still being received.
+        Returns what ``output_vectors()`` would give after each episode, and the
+        processor is left as if the last episode had been run alone. Spikes at or
+        after ``time`` in an episode are ignored. An episode may also be given as a
+        structured array of spikes, as in ``apply_spike_arrays()``.
+        """
+        if self._stats is not None:
+            self._stats._begin_run()
+        pkts, runs = self._encode_episodes(episodes, time)
+        begin = self._inp.time
+        target_time = begin + len(episodes) * time
+        if self._capture is not None:
+            self._capture._run(target_time, len(episodes) * time, True)
+        self._out.in_episodes = True
+        try:
+            self._hw_run(target_time, pkts, runs)
+        finally:
+            self._out.in_episodes = False
+        outputs = self._split_episodes(begin, len(episodes), time)
+        self._mark_run(target_time - time)
+        if self._stats is not None:
+            self._stats._end_run(len(episodes) * time)
+        return outputs
+
+    def _mark_run(self, start: int) -> None:
+        # output queries report the run starting at this timestep
+        self._last_run = start
+        self._out.queue.mark(start)
+
+        cutoff = self._retention.cutoff(start)
+        if cutoff is None:
+            return
+        queue = self._out.queue
+        num_old = queue.count_before(cutoff)
+        num_kept = int(queue.lens.sum()) - num_old
+        # let go of fires in batches at least as big as those kept to amortize it
+        if num_old and num_old >= max(num_kept, MIN_SEGMENT_FIRES):
+            self._retention.spill(self._epoch, *queue.trim(cutoff))
+
+    def _clear_io(self) -> None:
+        if self._retention.spill_path is not None:
+            everything = np.iinfo(np.int64).max
+            self._retention.spill(self._epoch, *self._out.queue.trim(everything))
+        self._retention.clear()
+        self._epoch += 1
+        self._inp.clear()
+        self._out.clear()
+
+    def _hw_run(self, target: int, pkts: np.ndarray, runs: np.ndarray) -> None:
+        # receive on a thread of its own while sending, then raise what stopped it
+        self._rx_error = None
+        self._out.expect(target)
+        rx_thread = Thread(target=self._rx_worker, args=(target,))
         rx_thread.daemon = True
         rx_thread.start()
-        self._last_run = self._inp.time
-        while self._inp.time < target_time:
-            spikes = []
-            while self._inp.queue and int(self._inp.queue[0].time) == self._inp.time:
-                spikes.append(self._inp.queue.popleft())
-            run_time = int(self._inp.queue[0].time) if self._inp.queue else target_time
-            self._hw_tx(
-                spikes,
-                run_time - self._inp.time,
-                (run_time == target_time),
-            )
+        self._hw_tx(pkts, runs)
         rx_thread.join()
+        if self._rx_error is not None:
+            raise self._rx_error
+
+    def _rx_worker(self, target: int) -> None:
+        try:
+            self._hw_rx(target)
+        except Exception as error:
+            # wake the sender, which would otherwise wait on credit forever
+            with self._progress:
+                self._rx_error = error
+                self._progress.notify_all()
 
     def _hw_rx(self, target: int, seek_clr: bool = False) -> None:
-        num_rx_bytes = width_bits_to_bytes(self._out.spk_fmt.calcsize())
-
+        self._settled = False
         while True:
-            if (
-                self._inp.time != target
-                and self._out.time == self._inp.time
-                and not seek_clr
-            ):
-                sleep(100e-9)
-                continue
+            with self._progress:
+                done = self._rx_decode(target, seek_clr)
+                self._progress.notify_all()
+                if done:
+                    self._settled = True
+                    return
+                self._progress.wait_for(lambda: self._rx_owed(target, seek_clr))
+            # block for one whole packet, but take everything already waiting
+            need = self._out.spk_layout.num_bytes - len(self._out.pending)
+            start = perf_counter()
             rx = self._interface.read(
-                num_rx_bytes,
-                10.0,
-            )[::-1]
-            if len(rx) != num_rx_bytes:
+                max(need, self._interface.input_waiting()), RESPONSE_TIMEOUT_SECS
+            )
+            if len(rx) < need:
                 raise RuntimeError("Did not receive coherent response from target.")
+            self._out.pending.extend(rx)
+            self._bytes_received += len(rx)
+            if self._stats is not None:
+                self._stats.read_wait_secs += perf_counter() - start
+                self._stats.bytes_received += len(rx)
+            if self._capture is not None:
+                self._capture._record(CaptureKind.RX, rx)
+
+    def _rx_owed(self, target: int, seek_clr: bool) -> bool:
+        # whether output has been sent for that has not been received yet
+        return (
+            self._inp.time == target
+            or self._out.time + self._out.held != self._inp.time
+            or seek_clr
+        )
 
-            match self._out.type:
-                case IoType.DISPATCH:
-                    out_dict = self._out.spk_fmt.unpack(rx)
-                    match out_dict["opcode"]:
-                        case DispatchOpcode.RUN:
-                            ran = self._out.cmd_fmt.unpack(rx)["operand"]
-                            self._out.time += ran
-                        case DispatchOpcode.SPK:
-                            out_idx = (
-                                out_dict["idx"]
-                                if len(self._out.spk_fmt._infos) > 1
-                                and self._out.spk_fmt._infos[1].name == "idx"
-                                else 0
-                            )
-                            self._out.queue[out_idx].append(float(self._out.time))
-                        case DispatchOpcode.SNC:
-                            break
-                        case DispatchOpcode.CLR:
-                            if seek_clr:
-                                return
-                            elif self._out.time and self._inp.type == IoType.DISPATCH:
-                                raise RuntimeError(
-                                    "Should not have received CLR during run()"
-                                )
-                            else:
-                                self._out.clear()
-                        case _:
-                            raise ValueError()
-
-                case IoType.STREAM:
-                    out_dict = self._out.spk_fmt.unpack(rx)
-                    for out_idx in range(self._network.num_outputs()):
-                        if out_dict[out_idx]:
-                            self._out.queue[out_idx].append(float(self._out.time))
-                    if out_dict[StreamFlag.CLR.name] and self._out.time:
-                        raise RuntimeError("Should not have received CLR during run()")
-
-                    self._out.time += 1
-
-                    # don't check DISO because SNC can't travel back in time
-                    if self._inp.type == IoType.STREAM and (
-                        out_dict[StreamFlag.SNC.name] != (self._out.time == target)
-                    ):
-                        raise RuntimeError(
-                            f"SNC flag {bool(out_dict[StreamFlag.SNC.name])}"
-                            f" does NOT match timing {self._out.time}/{target}"
-                        )
-                    if self._out.time == target:
-                        break
-
-    def _hw_tx(
-        self, spikes: Iterable[neuro.Spike], runs: int, sync: bool = False
-    ) -> None:
-        spike_dict = {
-            self._network.get_node(s.id).input_id: int(
-                s.value * spike_value_factor(self._network)
+    def _rx_decode(self, target: int, seek_clr: bool) -> bool:
+        # decode every whole packet received so far, returning whether the run ended
+        pkt_bytes = self._out.spk_layout.num_bytes
+        pending = self._out.pending
+        start = perf_counter()
+        done = False
+        if num_pkts := len(pending) // pkt_bytes:
+            # decoded in place, as a single pass reaches the end of the run or data
+            pkts = np.frombuffer(pending, np.uint8, num_pkts * pkt_bytes)
+            used, done = self._out.decode(
+                pkts.reshape(num_pkts, pkt_bytes), target, self._inp.type, seek_clr
             )
-            for s in spikes
-        }
-        if any(key < 0 for key in spike_dict.keys()):
-            raise ValueError("Cannot send spikes to non-input node.")
+            # the buffer cannot shrink while a view of it is held
+            del pkts
+            del pending[: used * pkt_bytes]
+            if self._stats is not None:
+                self._stats.pkts_received += used
+        if self._stats is not None:
+            self._stats.decode_secs += perf_counter() - start
+        return done
+
+    def _encode(
+        self,
+        times: np.ndarray,
+        idxs: np.ndarray,
+        vals: np.ndarray,
+        target: int,
+        sync: bool,
+        clear: bool = False,
+        begin: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        encode_secs = self._inp.encode_secs
+        encoded = self._inp.encode(
+            times, idxs, vals, target, self._max_run, sync, clear, begin
+        )
+        if self._stats is not None:
+            self._stats.encode_secs += self._inp.encode_secs - encode_secs
+        return encoded
+
+    def _pkts_now(self) -> np.ndarray:
+        # an idle dispatch source takes spikes for the current timestep right away
+        if self._inp.type != IoType.DISPATCH:
+            return np.empty((0, self._inp.spk_layout.num_bytes), dtype=np.uint8)
+        spikes = self._inp.queue.pop_before(self._inp.time + 1)
+        return self._encode(*spikes, self._inp.time, False)[0]
+
+    def _encode_episodes(
+        self, episodes: list[list[neuro.Spike] | np.ndarray], time: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if self._programmed is False:
+            raise RuntimeError("Cannot run before programming the target FPGA.")
 
-        # TODO: magic timing will be resolved by buffers PR
-        def pause(runs: int) -> None:
-            self._inp.time += runs
-            sleep(self._secs_per_run * runs)
+        if time < 1:
+            raise ValueError("It's not possible to run for less than 1 timestep")
+        if self._inp.queue:
+            raise RuntimeError("Cannot run episodes while spikes are already applied.")
+        pkts = []
+        runs = []
+        for ep_idx, spikes in enumerate(episodes):
+            begin = self._inp.time + ep_idx * time
+            if not isinstance(spikes, np.ndarray):
+                spikes = spike_array(spikes)
+            times, idxs, vals = self._desc.spikes(spikes)
+            now = times < time
+            ep_pkts, ep_runs = self._encode(
+                times[now] + begin,
+                idxs[now],
+                vals[now],
+                begin + time,
+                ep_idx == len(episodes) - 1,
+                True,
+                begin,
+            )
+            pkts.append(ep_pkts)
+            runs.append(ep_runs)
+        return np.concatenate(pkts), np.concatenate(runs)
+
+    def _split_episodes(
+        self, begin: int, num_episodes: int, time: int
+    ) -> list[list[list[float]]]:
+        # divide the outputs received since begin among consecutive episodes
+        starts = begin + time * np.arange(num_episodes + 1)
+        episodes = [[] for _ in range(num_episodes)]
+        for out_idx in range(self._network.num_outputs()):
+            times = self._out.queue.history(out_idx).astype(np.float64)
+            bounds = np.searchsorted(times, starts)
+            for ep_idx, ep_outs in enumerate(episodes):
+                ep_outs.append(
+                    (
+                        times[bounds[ep_idx] : bounds[ep_idx + 1]] - starts[ep_idx]
+                    ).tolist()
+                )
+        return episodes
+
+    def _hw_tx(self, pkts: np.ndarray, runs: np.ndarray) -> None:
+        start = self._inp.time
+        # chunks of the packets are written from views into them
+        pkts = np.ascontiguousarray(pkts)
+        ran = np.cumsum(runs)
+        sent = 0
+        while sent < len(pkts):
+            wait_start = perf_counter()
+            with self._progress:
+                while (chunk := self._tx_chunk(pkts, ran, start, sent))[1] == sent:
+                    if self._rx_error is not None:
+                        return
+                    if not self._progress.wait(RESPONSE_TIMEOUT_SECS):
+                        raise RuntimeError("Target stopped taking input.")
+            if self._stats is not None:
+                self._stats.credit_wait_secs += perf_counter() - wait_start
+            tx, end = chunk
+            self._writev(tx)
+            with self._progress:
+                self._inp.time = start + int(ran[end - 1])
+                self._progress.notify_all()
+            sent = end
+
+    def _write(self, data: bytes) -> None:
+        self._writev([data])
+
+    def _writev(self, buffers: list[bytes | np.ndarray]) -> None:
+        # transports take every buffer in one call, where serial ports need a copy
+        start = perf_counter()
+        if isinstance(self._interface, Transport):
+            self._interface.writev(buffers)
+        else:
+            self._interface.write(b"".join(map(bytes, buffers)))
+        num_bytes = sum(memoryview(buffer).nbytes for buffer in buffers)
+        self._bytes_sent += num_bytes
+        if self._stats is not None:
+            self._stats.write_secs += perf_counter() - start
+            self._count_sent(num_bytes)
+        if self._capture is not None:
+            self._capture._record(CaptureKind.TX, b"".join(map(bytes, buffers)))
+
+    def _count_sent(self, num_bytes: int) -> None:
+        self._stats.bytes_sent += num_bytes
+        # every input packet of a type is the same size
+        self._stats.pkts_sent += num_bytes // self._inp.spk_layout.num_bytes
+
+    def _tx_chunk(
+        self, pkts: np.ndarray, ran: np.ndarray, start: int, sent: int
+    ) -> tuple[list[np.ndarray], int]:
+        # Packets are credited back once the outputs of their timesteps arrive,
+        # as only then are they certain to have left the receive buffer
+        done = self._out.time + self._out.held - start
+        if self._stats is not None:
+            self._stats._lag(self._inp.time - self._out.time)
+        taken = int(np.searchsorted(ran, done, "right"))
+        end = min(len(pkts), taken + self._max_pkts_ahead - self._flush_pkts)
+        if end <= sent:
+            return [], sent
+        # packets are handed over as slices, so only a flagged packet is copied
+        tx = [pkts[sent:end]]
+        # the dispatch sink holds back runs without fires until it is synced
+        if end < len(pkts) and self._out.type == IoType.DISPATCH:
+            match self._inp.type:
+                case IoType.DISPATCH:
+                    tx.append(self._inp.snc_pkt)
+                case IoType.STREAM:
+                    last = pkts[end - 1 : end].copy()
+                    last[-1, -1] |= 0x80 >> StreamFlag.SNC
+                    tx = [pkts[sent : end - 1], last] if end - 1 > sent else [last]
+        return tx, end
 
-        match self._inp.type:
-            case IoType.DISPATCH:
-                [
-                    self._interface.write(
-                        self._inp.spk_fmt.pack(
-                            {
-                                "opcode": DispatchOpcode.SPK,
-                                "idx": idx,
-                                "val": val,
-                            }
-                        )[::-1]
-                    )
-                    for idx, val in spike_dict.items()
-                ]
-                while runs:
-                    to_run = min(
-                        [
-                            runs,
-                            self._max_run,
-                            self._max_runs_ahead + self._out.time - self._inp.time,
-                        ]
-                    )
-                    if not to_run:
-                        sleep(100e-9)
-                        continue
-                    self._interface.write(
-                        self._inp.cmd_fmt.pack(
-                            {
-                                "opcode": DispatchOpcode.RUN,
-                                "operand": to_run,
-                            }
-                        )[::-1]
-                    )
-                    pause(to_run)
-                    runs -= to_run
-                if sync:
-                    self._interface.write(
-                        self._inp.cmd_fmt.pack(
-                            {
-                                "opcode": DispatchOpcode.SNC,
-                                "operand": 0,
-                            }
-                        )[::-1]
-                    )
+    def _program(self, backend) -> None:
+        if not isinstance(self._interface, (Serial, Transport)):
+            raise RuntimeError("Cannot program network onto FPGA without a valid serial interface.")
 
-            case IoType.STREAM:
-                if not runs:
-                    raise RuntimeError(
-                        "Cannot send spikes to stream source without running."
-                    )
-                run_dict = {inp_idx: 0 for inp_idx in range(self._network.num_inputs())}
-                run_dict[StreamFlag.SNC.name] = False
-                run_dict[StreamFlag.CLR.name] = False
-                temp = run_dict.copy()
-                temp.update(spike_dict)
-                spike_dict = temp
-
-                spike_dict[StreamFlag.SNC.name] = sync and (runs == 1)
-                if self._inp.time == 0:
-                    spike_dict[StreamFlag.CLR.name] = True
-                self._interface.write(self._inp.spk_fmt.pack(spike_dict)[::-1])
-                pause(1)
-
-                for r in reversed(range(runs - 1)):
-                    if sync and r == 0:
-                        run_dict[StreamFlag.SNC.name] = True
-                    self._interface.write(self._inp.spk_fmt.pack(run_dict)[::-1])
-                    pause(1)
+        # emulated targets have no bitstream to program
+        if backend is not None:
+            backend.run()
+        self._programmed = True
+        # hardware will sometimes send CLR on startup
+        if backend is not None:
+            self._interface.poll(1)
+        self._drain()
+        self.clear_activity()
+
+    def _drain_limits(self) -> tuple[float, int]:
+        # Nothing more can arrive once every output owed has been received.
+        # Otherwise, a target sends everything in its TX buffer back-to-back, so
+        # it has stopped once quiet for a packet and the latency of the link
+        quiet = 0.0
+        if not self._settled:
+            quiet = (
+                DRAIN_QUIET_SECS
+                + self._out.spk_layout.num_bytes * BAUDS_PER_BYTE / self._baudrate
+            )
+        buffered = self._target_config["parameters"]["uart"]["buffer_tx"]
+        return quiet, buffered + self._interface.input_waiting()
+
+    def _drain(self) -> None:
+        # discard output until the target is quiet, which cannot take more than
+        # the bytes it could have buffered
+        quiet, limit = self._drain_limits()
+        drained = 0
+        while self._interface.poll(quiet):
+            drained += len(self._interface.read(self._interface.input_waiting()))
+            if drained > limit:
+                raise RuntimeError("Target did not stop sending while drained.")
+        self._settled = True
 
     def _build_network(self) -> type:
+        if self._target_config["default_tool"] is None:
+            return None
+
         proc = proc_name(self._network)
 
         nethash = hash_network(self._network, HASH_LEN)
@@ -610,53 +1350,48 @@ class Processor(neuro.Processor):
         return backend        
 
     def _set_comm_limits(self):
-        self._secs_per_run = 0.0
-
-        max_bytes_per_run = width_bits_to_bytes(self._out.spk_fmt.calcsize())
-        match self._out.type:
-            case IoType.DISPATCH:
-                max_bytes_per_run *= self._network.num_outputs() + 1
-                self._secs_per_run += (
-                    self._network.num_outputs()
-                    / self._target_config["parameters"]["clk_freq"]
-                )
-            case IoType.STREAM:
-                pass
-            case _:
-                raise ValueError()
-        self._secs_per_run += max_bytes_per_run * 10 / self._baudrate
-        self._max_run = SYSTEM_BUFFER // max_bytes_per_run
-        self._max_runs_ahead = self._max_run
+        self._max_pkts_ahead, self._max_run = comm_limits(
+            self._inp, self._out, self._target_config["parameters"]["uart"]
+        )
+        # an SNC may be sent after any packet to flush a dispatch sink
+        self._flush_pkts = int(
+            self._inp.type == IoType.DISPATCH and self._out.type == IoType.DISPATCH
+        )
 
-        match self._inp.type:
-            case IoType.DISPATCH:
-                # limited by both buffer size and command field width
-                self._max_run = min(
-                    2 ** (self._inp.cmd_fmt._infos[1].size) - 1,
-                    self._max_run,
-                )
-            case IoType.STREAM:
-                pass
-            case _:
-                raise ValueError()
+    def _check_auto_io(self, should_program: bool) -> None:
+        # the bitstream already on the target may be of any I/O type
+        if self._auto_io and not should_program:
+            raise ValueError(
+                'Cannot choose io_type="auto" for a target which is not programmed.'
+            )
 
     def _setup_io(self):
+        self._desc = NetworkDescriptor(self._network)
+        if self._auto_io:
+            # imported here as the link model is built on this module
+            from fpga.link import recommend_io_type
+
+            self._io_type = recommend_io_type(
+                self._network, self._target_name, self._baudrate, **self._workload
+            )
         match self._io_type[:2]:
             case "DI":
-                self._inp = InpConfig(IoType.DISPATCH, self._network)
+                self._inp = InpConfig(IoType.DISPATCH, self._desc)
             case "SI":
-                self._inp = InpConfig(IoType.STREAM, self._network)
+                self._inp = InpConfig(IoType.STREAM, self._desc)
             case _:
                 raise ValueError(
                     f"Invalid input type: {self._io_type[:2]}\nExpected: (D|S)I"
                 )
         match self._io_type[2:]:
             case "DO":
-                self._out = OutConfig(IoType.DISPATCH, self._network)
+                self._out = OutConfig(IoType.DISPATCH, self._desc)
             case "SO":
-                self._out = OutConfig(IoType.STREAM, self._network)
+                self._out = OutConfig(IoType.STREAM, self._desc)
             case _:
                 raise ValueError(
                     f"Invalid output type: {self._io_type[2:]}\nExpected: (D|S)O"
                 )
         self._set_comm_limits()
+        if self._capture is not None:
+            self._capture._header(self._io_type, self._network)
@@ -0,0 +1,84 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import os
+import pathlib as pl
+from collections import deque
+
+import numpy as np
+
+# fewest fires worth writing to a segment of their own
+MIN_SEGMENT_FIRES = 1 << 16
+
+
+class Retention:
+    """How much output history a processor keeps in memory.
+
+    Either the fires of the last ``timesteps`` timesteps or of the last ``runs``
+    runs are kept, or everything if neither is given. Fires which are let go are
+    written to NPZ segments in the ``spill`` directory if one is given, where
+    ``fpga.Processor.output_history()`` can still find them. Each segment holds
+    fires of a single epoch between clears, and clearing activity spills every
+    fire still held.
+    """
+
+    def __init__(
+        self,
+        timesteps: int | None = None,
+        runs: int | None = None,
+        spill: str | os.PathLike | None = None,
+    ):
+        if timesteps is not None and runs is not None:
+            raise ValueError("Cannot retain both a number of timesteps and runs.")
+        if (timesteps is not None and timesteps < 0) or (runs is not None and runs < 1):
+            raise ValueError("Cannot retain a negative number of timesteps or runs.")
+        self.timesteps = timesteps
+        self.runs = runs
+        self.spill_path = None if spill is None else pl.Path(spill)
+        self._run_starts = deque(maxlen=runs)
+        # (epoch, first time, last time, path) of each segment written
+        self._segments = []
+        if self.spill_path is not None:
+            self.spill_path.mkdir(parents=True, exist_ok=True)
+            self._num_files = len(list(self.spill_path.glob("*.npz")))
+
+    def cutoff(self, start: int) -> int | None:
+        """Earliest timestep still retained once a run starts at ``start``."""
+        if self.timesteps is not None:
+            return start - self.timesteps
+        if self.runs is not None:
+            self._run_starts.append(start)
+            return self._run_starts[0]
+        return None
+
+    def clear(self) -> None:
+        self._run_starts.clear()
+
+    def spill(self, epoch: int, times: np.ndarray, idxs: np.ndarray) -> None:
+        """Write fires given as parallel arrays of timesteps and outputs."""
+        if self.spill_path is None or not len(times):
+            return
+        path = self.spill_path / f"{self._num_files:08d}.npz"
+        np.savez(path, epoch=epoch, times=times, idxs=idxs)
+        self._segments.append((epoch, int(times.min()), int(times.max()), path))
+        self._num_files += 1
+
+    def spilled(
+        self, epoch: int, out_idx: int, start: int, stop: int | None
+    ) -> list[np.ndarray]:
+        """Load the spilled fires of an output in ``[start, stop)`` by segment."""
+        found = []
+        for seg_epoch, first, last, path in self._segments:
+            if seg_epoch != epoch or last < start:
+                continue
+            if stop is not None and first >= stop:
+                continue
+            with np.load(path) as segment:
+                times = segment["times"][segment["idxs"] == out_idx]
+            keep = times >= start
+            if stop is not None:
+                keep &= times < stop
+            found.append(times[keep])
+        return found
@@ -0,0 +1,148 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import neuro
+import numpy as np
+
+from fpga._processor import _InpQueue, _OutQueue
+from fpga.network import NetworkDescriptor, spike_array
+from fpga.risp import EventSim, RispNetwork
+
+
+class SimProcessor(neuro.Processor):
+    """Software stand-in for ``fpga.Processor`` backed by the event-driven model.
+
+    Spikes are quantized exactly as ``fpga.Processor`` sends them and outputs are
+    reported with the same timing, so the two can be used interchangeably.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._network = None
+        self.clear()
+
+    def apply_spike(self, spike: neuro.Spike) -> None:
+        if self._network is None:
+            raise RuntimeError("Cannot apply spikes before loading a network.")
+
+        if spike.time < 0:
+            raise RuntimeError("Spikes cannot be scheduled in the past.")
+        self._inp_queue.append(int(spike.time) + self._sim.time, spike.id, spike.value)
+
+    def apply_spikes(self, spikes: list[neuro.Spike]) -> None:
+        self.apply_spike_arrays(spike_array(spikes))
+
+    def apply_spike_arrays(
+        self,
+        ids: np.ndarray,
+        times: np.ndarray | None = None,
+        values: np.ndarray | None = None,
+    ) -> None:
+        if self._network is None:
+            raise RuntimeError("Cannot apply spikes before loading a network.")
+
+        times, idxs, vals = self._desc.spikes(ids, times, values)
+        self._inp_queue.extend(times + self._sim.time, idxs, vals)
+
+    def clear(self) -> None:
+        self._network = None
+        self._sim = None
+        self._desc = None
+        self._clear_io()
+
+    def clear_activity(self) -> None:
+        if self._network is None:
+            raise RuntimeError(
+                "Cannot clear network activity before loading a network."
+            )
+
+        self._sim.clear()
+        self._clear_io()
+
+    def load_network(self, net: neuro.Network) -> None:
+        self.clear()
+        self._network = net
+        self._sim = EventSim(RispNetwork(net))
+        self._desc = NetworkDescriptor(net)
+        self._clear_io()
+
+    def output_array(self, out_idx: int) -> np.ndarray:
+        """Timesteps since the last clear at which an output fired in the last run.
+
+        This is a read-only view of the output store rather than a copy.
+        """
+        if self._network is None:
+            raise RuntimeError("Cannot get output array before loading a network.")
+
+        return self._out_queue.latest(out_idx)
+
+    def output_count(self, out_idx: int) -> int:
+        return len(self.output_array(out_idx))
+
+    def output_counts(self) -> list[int]:
+        return [
+            self.output_count(out_idx) for out_idx in range(self._network.num_outputs())
+        ]
+
+    def output_last_fire(self, out_idx: int) -> float:
+        outs = self.output_array(out_idx)
+        return float(outs[-1] - self._last_run) if len(outs) else -1
+
+    def output_last_fires(self) -> list[float]:
+        return [
+            self.output_last_fire(out_idx)
+            for out_idx in range(self._network.num_outputs())
+        ]
+
+    def output_vector(self, out_idx: int) -> list[float]:
+        if self._network is None:
+            raise RuntimeError("Cannot get output vector before loading a network.")
+
+        return (self._out_queue.latest(out_idx) - float(self._last_run)).tolist()
+
+    def output_vectors(self) -> list[list[float]]:
+        return [
+            self.output_vector(out_idx)
+            for out_idx in range(self._network.num_outputs())
+        ]
+
+    def output_raster(self) -> np.ndarray:
+        if self._network is None:
+            raise RuntimeError("Cannot get output raster before loading a network.")
+
+        queue = self._out_queue
+        raster = np.zeros((self._sim.time - self._last_run, len(queue)), dtype=bool)
+        for out_idx in range(len(queue)):
+            raster[queue.latest(out_idx) - self._last_run, out_idx] = True
+        return raster
+
+    def run(self, time: int) -> None:
+        if self._network is None:
+            raise RuntimeError("Cannot run before loading a network.")
+
+        if time < 1:
+            raise ValueError("It's not possible to run for less than 1 timestep")
+        self._last_run = self._sim.time
+        self._out_queue.mark(self._last_run)
+        target_time = self._sim.time + time
+
+        times, idxs, vals = self._inp_queue.pop_before(target_time)
+
+        # the last spike applied to an input for a timestep overrides the others
+        keys = times * self._network.num_inputs() + idxs
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        order = last[np.argsort(times[last], kind="stable")]
+
+        fire_times, fire_idxs = self._sim.run(
+            time, times[order], idxs[order], vals[order]
+        )
+        self._out_queue.add(fire_times, fire_idxs)
+
+    def _clear_io(self) -> None:
+        self._inp_queue = _InpQueue(self._desc) if self._desc is not None else None
+        self._last_run = 0
+        num_out = self._network.num_outputs() if self._network else 0
+        self._out_queue = _OutQueue(num_out)
@@ -0,0 +1,159 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import os
+import pathlib as pl
+from json import dumps
+from time import perf_counter, time
+
+# counters which add up over runs, in the order they are reported
+COUNTERS = [
+    "runs",
+    "timesteps",
+    "secs",
+    "bytes_sent",
+    "bytes_received",
+    "pkts_sent",
+    "pkts_received",
+    "encode_secs",
+    "write_secs",
+    "credit_wait_secs",
+    "read_wait_secs",
+    "decode_secs",
+]
+
+
+class StatsSnapshot:
+    """Where a processor's time and bytes went, in total or over one run.
+
+    The sending thread encodes packets (``encode_secs``), waits for the target to
+    credit back buffer space before sending more (``credit_wait_secs``) and
+    writes them (``write_secs``), while the receiving thread waits for output
+    (``read_wait_secs``) and decodes it (``decode_secs``). A run mostly spent
+    writing or waiting to read is bound by the link, one mostly spent encoding or
+    decoding is bound by the host, and one mostly spent waiting for credit is
+    stalled on flow control. ``max_lag`` is the most timesteps input got ahead of
+    output during the last run.
+    """
+
+    def __init__(self):
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.max_lag = 0
+
+    def __sub__(self, other: "StatsSnapshot") -> "StatsSnapshot":
+        diff = StatsSnapshot()
+        for name in COUNTERS:
+            setattr(diff, name, getattr(self, name) - getattr(other, name))
+        diff.max_lag = self.max_lag
+        return diff
+
+    def __repr__(self) -> str:
+        return (
+            f"StatsSnapshot({self.runs} runs of {self.timesteps} timesteps in"
+            + f" {self.secs:.3g} s: {self.bytes_sent} B TX, {self.bytes_received} B RX)"
+        )
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in COUNTERS + ["max_lag"]}
+
+
+class Stats(StatsSnapshot):
+    """Live I/O counters of one processor, which are only kept if it is given some.
+
+    Every run is handed to each of ``exporters`` as it ends, along with the
+    totals so far, through their ``export(run, total)`` method.
+    """
+
+    def __init__(self, exporters: list | None = None):
+        super().__init__()
+        self.exporters = [] if exporters is None else exporters
+        # counters of the last run to end
+        self.last_run = None
+        self._run_start = None
+        self._run_clock = 0.0
+
+    def snapshot(self) -> StatsSnapshot:
+        """Copy of the counters so far."""
+        return self - StatsSnapshot()
+
+    def clear(self) -> None:
+        StatsSnapshot.__init__(self)
+        self.last_run = None
+
+    def _begin_run(self) -> None:
+        self._run_start = self.snapshot()
+        self._run_clock = perf_counter()
+        self.max_lag = 0
+
+    def _end_run(self, timesteps: int) -> None:
+        self.runs += 1
+        self.timesteps += timesteps
+        self.secs += perf_counter() - self._run_clock
+        self.last_run = self - self._run_start
+        total = self.snapshot()
+        for exporter in self.exporters:
+            exporter.export(self.last_run, total)
+
+    def _lag(self, lag: int) -> None:
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+
+class JsonlExporter:
+    """Appends the counters of each run as a line of JSON to ``path``.
+
+    The file is kept open until ``close()``, and each line is flushed as it is
+    written so that the file can be followed while runs go on.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = pl.Path(path)
+        self._file = open(self.path, "a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def export(self, run: StatsSnapshot, total: StatsSnapshot) -> None:
+        self._file.write(dumps({"time": time(), **run.as_dict()}) + "\n")
+        self._file.flush()
+
+
+class PrometheusExporter:
+    """Keeps the totals in ``path`` in the Prometheus text format.
+
+    The file is replaced atomically after every run, as the node exporter's
+    textfile collector expects. Each sample carries ``labels``, e.g. to tell
+    boards apart.
+    """
+
+    def __init__(self, path: str | os.PathLike, labels: dict[str, str] | None = None):
+        self.path = pl.Path(path)
+        self.labels = {} if labels is None else labels
+
+    def export(self, run: StatsSnapshot, total: StatsSnapshot) -> None:
+        labels = ",".join(f'{key}="{value}"' for key, value in self.labels.items())
+        labels = f"{{{labels}}}" if labels else ""
+        lines = []
+        for name, value in total.as_dict().items():
+            if name == "max_lag":
+                # lag is only meaningful per run
+                metric, kind = "fpga_last_run_max_lag_timesteps", "gauge"
+                value = run.max_lag
+            else:
+                metric = "run_secs" if name == "secs" else name
+                metric = metric.replace("secs", "seconds").replace("pkts", "packets")
+                metric, kind = f"fpga_{metric}_total", "counter"
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.append(f"{metric}{labels} {value}")
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,136 @@
+// Copyright (c) 2026 Keegan Dent
+//
+// This Source Code Form is subject to the terms of the Mozilla Public
+// License, v. 2.0. If a copy of the MPL was not distributed with this
+// file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+// C interface to a Verilated axis_processor, loaded by fpga.verilated via ctypes.
+// Packets cross the interface as little-endian bytes, the same as on the UART.
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+#include "Vaxis_processor.h"
+#include "verilated.h"
+
+namespace {
+
+template <typename T>
+void set_port(T& port, const uint8_t* data, size_t num_bytes) {
+    T val = 0;
+    for (size_t i = 0; i < num_bytes; i++)
+        val |= static_cast<T>(data[i]) << (8 * i);
+    port = val;
+}
+
+template <std::size_t N>
+void set_port(VlWide<N>& port, const uint8_t* data, size_t num_bytes) {
+    for (size_t w = 0; w < N; w++)
+        port[w] = 0;
+    for (size_t i = 0; i < num_bytes; i++)
+        port[i / 4] |= static_cast<EData>(data[i]) << (8 * (i % 4));
+}
+
+template <typename T>
+void get_port(const T& port, std::vector<uint8_t>& data, size_t num_bytes) {
+    for (size_t i = 0; i < num_bytes; i++)
+        data.push_back(static_cast<uint8_t>(port >> (8 * i)));
+}
+
+template <std::size_t N>
+void get_port(const VlWide<N>& port, std::vector<uint8_t>& data, size_t num_bytes) {
+    for (size_t i = 0; i < num_bytes; i++)
+        data.push_back(static_cast<uint8_t>(port[i / 4] >> (8 * (i % 4))));
+}
+
+struct Device {
+    VerilatedContext ctx;
+    Vaxis_processor top{&ctx};
+    size_t inp_bytes;
+    size_t out_bytes;
+    uint64_t cycles = 0;
+    std::vector<uint8_t> tx;
+
+    // drive one clock cycle, offering the packet at inp if not null
+    // returns whether the packet was accepted
+    bool cycle(const uint8_t* inp) {
+        // inputs change just after the rising edge like any other register output
+        if (inp)
+            set_port(top.s_axis_tdata, inp, inp_bytes);
+        top.s_axis_tvalid = inp != nullptr;
+        top.m_axis_tready = 1;
+        top.eval();
+        top.clk = 0;
+        top.eval();
+        bool accepted = inp && top.s_axis_tready;
+        if (top.m_axis_tvalid)
+            get_port(top.m_axis_tdata, tx, out_bytes);
+        top.clk = 1;
+        top.eval();
+        cycles++;
+        return accepted;
+    }
+};
+
+}  // namespace
+
+extern "C" {
+
+void* proc_new(size_t inp_bytes, size_t out_bytes) {
+    Device* dev = new Device();
+    dev->inp_bytes = inp_bytes;
+    dev->out_bytes = out_bytes;
+    return dev;
+}
+
+void proc_free(void* handle) { delete static_cast<Device*>(handle); }
+
+void proc_reset(void* handle) {
+    Device* dev = static_cast<Device*>(handle);
+    dev->top.s_axis_tvalid = 0;
+    dev->top.m_axis_tready = 0;
+    dev->top.clk = 1;
+    dev->top.arstn = 1;
+    dev->top.eval();
+    dev->top.arstn = 0;
+    dev->top.eval();
+    dev->top.clk = 0;
+    dev->top.eval();
+    dev->top.arstn = 1;
+    dev->top.eval();
+    dev->top.clk = 1;
+    dev->top.eval();
+    dev->tx.clear();
+    dev->cycles = 0;
+}
+
+// offer num_pkts packets back-to-back, then clock until the processor has been
+// idle for settle cycles so every resulting output packet has been collected
+void proc_write(void* handle, const uint8_t* data, size_t num_pkts, uint64_t settle) {
+    Device* dev = static_cast<Device*>(handle);
+    for (size_t i = 0; i < num_pkts;) {
+        if (dev->cycle(data + i * dev->inp_bytes))
+            i++;
+    }
+    for (uint64_t idle = 0; idle < settle;) {
+        size_t pending = dev->tx.size();
+        dev->cycle(nullptr);
+        idle = (dev->top.s_axis_tready && dev->tx.size() == pending) ? idle + 1 : 0;
+    }
+}
+
+size_t proc_output_waiting(void* handle) { return static_cast<Device*>(handle)->tx.size(); }
+
+size_t proc_read(void* handle, uint8_t* data, size_t size) {
+    Device* dev = static_cast<Device*>(handle);
+    if (size > dev->tx.size())
+        size = dev->tx.size();
+    std::copy(dev->tx.begin(), dev->tx.begin() + size, data);
+    dev->tx.erase(dev->tx.begin(), dev->tx.begin() + size);
+    return size;
+}
+
+uint64_t proc_cycles(void* handle) { return static_cast<Device*>(handle)->cycles; }
+}
@@ -0,0 +1,161 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import neuro
+import numpy as np
+
+from fpga._processor import DispatchOpcode, InpConfig, IoType, OutConfig, StreamFlag
+from fpga.network import NetworkDescriptor
+
+# one decoded packet, or one spike of a streamed packet
+DECODED_DTYPE = np.dtype(
+    [
+        ("pkt", np.int64),
+        ("timestep", np.int64),
+        ("opcode", np.uint8),
+        ("index", np.int64),
+        ("value", np.int64),
+    ]
+)
+
+# packets decoded at once, which bounds the memory taken by wide stream packets
+CHUNK_PKTS = 1 << 20
+
+
+def decode_packets(
+    net: neuro.Network, io_type: str, data: bytes, output: bool = True
+) -> np.ndarray:
+    """Decode raw bytes of packets in one direction into a table of events.
+
+    The bytes are packets of the sink, or of the source unless ``output`` is set,
+    of a processor with ``io_type`` in wire order, starting at a packet boundary.
+    Returns a structured array of ``DECODED_DTYPE`` with the events of each
+    packet at the ``timestep`` they happen since the last CLR. Dispatch packets
+    are one event each, where ``value`` is the length of a RUN or the charge of a
+    SPK. A streamed packet is a RUN of 1 between any CLR and SPKs of its inputs
+    or outputs before it and an SNC after it. The stream sink of a processor with
+    dispatch input instead holds an SNC until its next packet, so the SNC of such
+    a packet comes first, at the timestep the one before it ended. Fires without a
+    charge have a value of 1, and any trailing partial packet is ignored.
+    """
+    io_type = io_type.upper()
+    desc = NetworkDescriptor(net)
+    if output:
+        config = OutConfig(
+            IoType.DISPATCH if io_type[2] == "D" else IoType.STREAM, desc
+        )
+    else:
+        config = InpConfig(
+            IoType.DISPATCH if io_type[0] == "D" else IoType.STREAM, desc
+        )
+    pkt_bytes = config.spk_layout.num_bytes
+    pkts = np.frombuffer(data, dtype=np.uint8, count=len(data) // pkt_bytes * pkt_bytes)
+    pkts = pkts.reshape(-1, pkt_bytes)
+
+    tables = []
+    time = 0
+    for first in range(0, len(pkts), CHUNK_PKTS):
+        chunk = pkts[first : first + CHUNK_PKTS]
+        match config.type:
+            case IoType.DISPATCH:
+                table, time = _decode_dispatch(config, chunk, time)
+            case IoType.STREAM:
+                held = output and io_type[0] == "D"
+                table, time = _decode_stream(config, chunk, time, held)
+        table["pkt"] += first
+        tables.append(table)
+    return np.concatenate(tables) if tables else np.empty(0, dtype=DECODED_DTYPE)
+
+
+def packet_histogram(table: np.ndarray) -> dict[str, int]:
+    """Number of events of each opcode in a table from ``decode_packets()``."""
+    counts = np.bincount(table["opcode"], minlength=len(DispatchOpcode))
+    return {opcode.name: int(counts[opcode]) for opcode in DispatchOpcode}
+
+
+def _timesteps(ran: np.ndarray, clr: np.ndarray, time: int) -> tuple[np.ndarray, int]:
+    # time of each packet before it runs, restarting from 0 at every CLR
+    after = time + np.cumsum(ran)
+    before = after - ran
+    clr_rows = np.flatnonzero(clr)
+    base = np.append(0, before[clr_rows])
+    before -= base[np.cumsum(clr)]
+    end = int(after[-1] - base[-1]) if len(ran) else time
+    return before, end
+
+
+def _decode_dispatch(
+    config: InpConfig | OutConfig, pkts: np.ndarray, time: int
+) -> tuple[np.ndarray, int]:
+    fields = config.cmd_layout.unpack(pkts)
+    opcodes = fields["opcode"]
+    is_run = opcodes == DispatchOpcode.RUN
+    is_spk = opcodes == DispatchOpcode.SPK
+    timesteps, time = _timesteps(
+        np.where(is_run, fields["operand"], 0), opcodes == DispatchOpcode.CLR, time
+    )
+
+    table = np.zeros(len(pkts), dtype=DECODED_DTYPE)
+    table["pkt"] = np.arange(len(pkts))
+    table["timestep"] = timesteps
+    table["opcode"] = opcodes
+    table["index"] = -1
+    table["value"] = np.where(is_run, fields["operand"], 0)
+    spk_fields = config.spk_layout.unpack(pkts[is_spk])
+    # single-I/O networks have no index field
+    table["index"][is_spk] = spk_fields.get("idx", 0)
+    table["value"][is_spk] = spk_fields.get("val", 1)
+    return table, time
+
+
+def _decode_stream(
+    config: InpConfig | OutConfig, pkts: np.ndarray, time: int, held_snc: bool
+) -> tuple[np.ndarray, int]:
+    layout = config.spk_layout
+    snc = layout.unpack_fields(pkts, StreamFlag.SNC.name)[:, 0].astype(bool)
+    clr = layout.unpack_fields(pkts, StreamFlag.CLR.name)[:, 0].astype(bool)
+    ends = np.append(time, np.empty(len(pkts), dtype=np.int64))
+    timesteps, time = _timesteps(np.ones(len(pkts), dtype=np.int64), clr, time)
+    ends[1:] = timesteps + 1
+    num_io = config._num_net_io()
+    if num_io:
+        vals = layout.unpack_fields(pkts, 0, num_io)
+        spk_pkts, spk_idxs = np.nonzero(vals)
+        spk_vals = vals[spk_pkts, spk_idxs]
+    else:
+        spk_pkts = spk_idxs = spk_vals = np.empty(0, dtype=np.int64)
+
+    # events of a packet go CLR, SPKs, RUN then SNC, unless the SNC was held
+    clr_pkts = np.flatnonzero(clr)
+    snc_pkts = np.flatnonzero(snc)
+    run_pkts = np.arange(len(pkts))
+    rows = np.concatenate([clr_pkts, spk_pkts, run_pkts, snc_pkts])
+    order = np.concatenate(
+        [
+            np.ones(len(clr_pkts), dtype=np.int64),
+            np.full(len(spk_pkts), 2, dtype=np.int64),
+            np.full(len(run_pkts), 3, dtype=np.int64),
+            np.full(len(snc_pkts), 0 if held_snc else 4, dtype=np.int64),
+        ]
+    )
+    table = np.zeros(len(rows), dtype=DECODED_DTYPE)
+    table["pkt"] = rows
+    table["opcode"] = np.concatenate(
+        [
+            np.full(len(clr_pkts), DispatchOpcode.CLR),
+            np.full(len(spk_pkts), DispatchOpcode.SPK),
+            np.full(len(run_pkts), DispatchOpcode.RUN),
+            np.full(len(snc_pkts), DispatchOpcode.SNC),
+        ]
+    )
+    table["index"] = -1
+    table["index"][len(clr_pkts) : len(clr_pkts) + len(spk_pkts)] = spk_idxs
+    table["value"][len(clr_pkts) : len(clr_pkts) + len(spk_pkts)] = spk_vals
+    table["value"][order == 3] = 1
+    table["timestep"] = timesteps[rows]
+    # an SNC happens once its packet has run, or before any CLR if it was held
+    table["timestep"][len(rows) - len(snc_pkts) :] = ends[snc_pkts + (not held_snc)]
+    table = table[np.lexsort((order, rows))]
+    return table, time
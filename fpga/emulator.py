@@ -0,0 +1,371 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import os
+import select
+import socket
+import tty
+from threading import Condition, Thread
+from time import monotonic, sleep
+
+import neuro
+import numpy as np
+
+from fpga._math import unsigned_width, width_bits_to_bytes, width_nearest_byte
+from fpga._processor import BAUDS_PER_BYTE, DispatchOpcode, IoType, StreamFlag
+from fpga.network import charge_width
+from fpga.risp import RispNetwork, RispSim
+
+
+def _io_types(io_type: str) -> tuple[IoType, IoType]:
+    io_type = io_type.upper()
+    match io_type[:2]:
+        case "DI":
+            inp_type = IoType.DISPATCH
+        case "SI":
+            inp_type = IoType.STREAM
+        case _:
+            raise ValueError(f"Invalid input type: {io_type[:2]}\nExpected: (D|S)I")
+    match io_type[2:]:
+        case "DO":
+            out_type = IoType.DISPATCH
+        case "SO":
+            out_type = IoType.STREAM
+        case _:
+            raise ValueError(f"Invalid output type: {io_type[2:]}\nExpected: (D|S)O")
+    return inp_type, out_type
+
+
+def _prefix_width(io_type: IoType) -> int:
+    match io_type:
+        case IoType.DISPATCH:
+            return unsigned_width(len(DispatchOpcode) - 1)
+        case IoType.STREAM:
+            return len(StreamFlag)
+        case _:
+            raise ValueError()
+
+
+def packet_widths(net: neuro.Network, io_type: str) -> tuple[int, int]:
+    """Bit widths of the input and output packets of a processor for ``net``."""
+    inp_type, out_type = _io_types(io_type)
+    match inp_type:
+        case IoType.DISPATCH:
+            inp_spk_width = unsigned_width(net.num_inputs() - 1) + charge_width(net)
+        case IoType.STREAM:
+            inp_spk_width = net.num_inputs() * charge_width(net)
+    match out_type:
+        case IoType.DISPATCH:
+            out_spk_width = unsigned_width(net.num_outputs() - 1)
+        case IoType.STREAM:
+            out_spk_width = net.num_outputs()
+    return (
+        width_nearest_byte(_prefix_width(inp_type) + inp_spk_width),
+        width_nearest_byte(_prefix_width(out_type) + out_spk_width),
+    )
+
+
+class Emulator:
+    """Byte-level software model of ``uart_processor`` with a RISP network.
+
+    Bytes written to the emulator are interpreted as they would be by the
+    ``*_source`` module selected by ``io_type`` and the bytes produced are those the
+    ``*_sink`` module would transmit, including the little-endian byte order of the
+    ``axis_adapter`` width conversions. The UART itself is assumed to be lossless.
+    """
+
+    def __init__(self, net: neuro.Network, io_type: str = "DISO"):
+        self._inp_type, self._out_type = _io_types(io_type)
+        self._sim = RispSim(RispNetwork(net))
+        self._charge_width = charge_width(net)
+        num_inp = net.num_inputs()
+        num_out = net.num_outputs()
+
+        self._inp_pkt_width, self._out_pkt_width = packet_widths(net, io_type)
+        self._inp_pkt_bytes = width_bits_to_bytes(self._inp_pkt_width)
+        self._out_pkt_bytes = width_bits_to_bytes(self._out_pkt_width)
+        self._inp_pfx_width = _prefix_width(self._inp_type)
+        self._inp_idx_width = unsigned_width(num_inp - 1)
+        self._out_pfx_width = _prefix_width(self._out_type)
+        self._out_idx_width = unsigned_width(num_out - 1)
+        # sink reports elapsed runs once its counter saturates
+        self._max_runs = (1 << (self._out_pkt_width - self._out_pfx_width)) - 1
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Equivalent of asserting the global reset of the processor."""
+        self._rx = bytearray()
+        self._tx = bytearray()
+        self._sim.clear()
+        self._net_inp = np.zeros(self._sim.model.num_inputs, dtype=np.int64)
+        # dispatch sink run counter and stream sink sticky flags
+        self._runs = 0
+        self._sync = False
+        self._clear = False
+
+    @property
+    def time(self) -> int:
+        """Timesteps the network has run since it was last cleared."""
+        return self._sim.time
+
+    def write(self, data: bytes) -> None:
+        """Receive bytes from the host, processing every completed packet."""
+        self._rx.extend(data)
+        num_pkts = len(self._rx) // self._inp_pkt_bytes
+        for i in range(num_pkts):
+            self._source(
+                int.from_bytes(
+                    self._rx[i * self._inp_pkt_bytes : (i + 1) * self._inp_pkt_bytes],
+                    "little",
+                )
+            )
+        del self._rx[: num_pkts * self._inp_pkt_bytes]
+
+    def read(self, size: int = -1) -> bytes:
+        """Take up to ``size`` bytes (or all if negative) bound for the host."""
+        if size < 0:
+            size = len(self._tx)
+        data = bytes(self._tx[:size])
+        del self._tx[:size]
+        return data
+
+    def output_waiting(self) -> int:
+        return len(self._tx)
+
+    def _field(self, pkt: int, offset: int, width: int, signed: bool = False) -> int:
+        # fields are packed from the MSB of the packet like the bitstruct formats
+        val = (pkt >> (self._inp_pkt_width - offset - width)) & ((1 << width) - 1)
+        if signed and width and val >> (width - 1):
+            val -= 1 << width
+        return val
+
+    def _source(self, pkt: int) -> None:
+        match self._inp_type:
+            case IoType.DISPATCH:
+                match self._field(pkt, 0, self._inp_pfx_width):
+                    case DispatchOpcode.RUN:
+                        for _ in range(
+                            self._field(
+                                pkt,
+                                self._inp_pfx_width,
+                                self._inp_pkt_width - self._inp_pfx_width,
+                            )
+                        ):
+                            self._step()
+                    case DispatchOpcode.SPK:
+                        idx = self._field(pkt, self._inp_pfx_width, self._inp_idx_width)
+                        if idx < len(self._net_inp):
+                            self._net_inp[idx] = self._field(
+                                pkt,
+                                self._inp_pfx_width + self._inp_idx_width,
+                                self._charge_width,
+                                True,
+                            )
+                    case DispatchOpcode.SNC:
+                        self._sink(None, sync=True)
+                    case DispatchOpcode.CLR:
+                        self._net_inp[:] = 0
+                        self._sim.clear()
+                        self._sink(None, clear=True)
+            case IoType.STREAM:
+                sync = bool(self._field(pkt, StreamFlag.SNC, 1))
+                clear = bool(self._field(pkt, StreamFlag.CLR, 1))
+                for i in range(len(self._net_inp)):
+                    self._net_inp[i] = self._field(
+                        pkt,
+                        self._inp_pfx_width + i * self._charge_width,
+                        self._charge_width,
+                        True,
+                    )
+                if clear:
+                    self._sim.clear()
+                self._step(sync, clear)
+
+    def _step(self, sync: bool = False, clear: bool = False) -> None:
+        fires = self._sim.step(self._net_inp)
+        self._net_inp[:] = 0
+        self._sink(fires, sync, clear)
+
+    def _sink(
+        self, fires: np.ndarray | None, sync: bool = False, clear: bool = False
+    ) -> None:
+        """Emit the packets for one network event; ``fires`` is None without a run."""
+        match self._out_type:
+            case IoType.DISPATCH:
+                runs = self._runs
+                if fires is not None:
+                    self._runs += 1
+                if runs and (
+                    sync
+                    or clear
+                    or runs == self._max_runs
+                    or (fires is not None and fires.any())
+                ):
+                    self._emit_dispatch(DispatchOpcode.RUN, runs)
+                    self._runs -= runs
+                if clear:
+                    self._emit_dispatch(DispatchOpcode.CLR)
+                if fires is not None:
+                    for idx in np.flatnonzero(fires):
+                        self._emit_dispatch(DispatchOpcode.SPK, int(idx))
+                if sync:
+                    self._emit_dispatch(DispatchOpcode.SNC)
+                # a saturated counter is reported on the very next cycle
+                if self._runs == self._max_runs:
+                    self._emit_dispatch(DispatchOpcode.RUN, self._runs)
+                    self._runs = 0
+            case IoType.STREAM:
+                if fires is None:
+                    self._sync = self._sync or sync
+                    self._clear = self._clear or clear
+                    return
+                pkt = int(self._sync or sync) << (self._out_pkt_width - 1)
+                pkt |= int(self._clear or clear) << (self._out_pkt_width - 2)
+                for idx in np.flatnonzero(fires):
+                    pkt |= 1 << (
+                        self._out_pkt_width - self._out_pfx_width - int(idx) - 1
+                    )
+                self._sync = False
+                self._clear = False
+                self._tx.extend(pkt.to_bytes(self._out_pkt_bytes, "little"))
+
+    def _emit_dispatch(self, opcode: DispatchOpcode, operand: int = 0) -> None:
+        operand_width = self._out_pkt_width - self._out_pfx_width
+        if opcode == DispatchOpcode.SPK:
+            operand <<= operand_width - self._out_idx_width
+        pkt = (opcode << operand_width) | operand
+        self._tx.extend(pkt.to_bytes(self._out_pkt_bytes, "little"))
+
+
+class PtyServer:
+    """Serves a byte-level device such as ``Emulator`` on a pseudo-terminal.
+
+    The slave side at ``path`` behaves like the cdev of a UART, so it can be handed to
+    ``fpga.Processor`` directly. If ``baud_rate`` is given, each direction is paced to
+    the byte rate of an 8N1 UART at that rate; otherwise bytes move as fast as the
+    host allows.
+    """
+
+    def __init__(self, device: Emulator, baud_rate: int | None = None):
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.path = os.ttyname(self._slave)
+        self._start(device, baud_rate)
+
+    def _start(self, device: Emulator, baud_rate: int | None) -> None:
+        self._device = device
+        self._secs_per_byte = BAUDS_PER_BYTE / baud_rate if baud_rate else 0.0
+        self._cond = Condition()
+        self._closed = False
+        self._threads = [
+            Thread(target=self._serve_rx, daemon=True),
+            Thread(target=self._serve_tx, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            # TX may be blocked indefinitely on a peer that stopped reading
+            thread.join(1.0)
+        os.close(self._slave)
+        os.close(self._master)
+
+    def _pace(self, deadline: float, num_bytes: int) -> float:
+        if not self._secs_per_byte:
+            return deadline
+        deadline = max(deadline, monotonic()) + num_bytes * self._secs_per_byte
+        sleep(max(0.0, deadline - monotonic()))
+        return deadline
+
+    def _serve_rx(self) -> None:
+        deadline = 0.0
+        while not self._closed:
+            if not select.select([self._master], [], [], 0.1)[0]:
+                continue
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            deadline = self._pace(deadline, len(data))
+            with self._cond:
+                self._device.write(data)
+                self._cond.notify_all()
+
+    def _serve_tx(self) -> None:
+        deadline = 0.0
+        while True:
+            with self._cond:
+                while not self._closed and not self._device.output_waiting():
+                    self._cond.wait()
+                if self._closed:
+                    return
+                data = self._device.read()
+            deadline = self._pace(deadline, len(data))
+            while data:
+                try:
+                    data = data[os.write(self._master, data) :]
+                except OSError:
+                    return
+
+
+class SocketServer(PtyServer):
+    """Serves a byte-level device such as ``Emulator`` to one TCP client.
+
+    The server listens at ``address``, which ``fpga.Processor`` reaches as
+    ``tcp://host:port``. Bytes are paced as with ``PtyServer``.
+    """
+
+    def __init__(
+        self,
+        device: Emulator,
+        baud_rate: int | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self._listener = socket.create_server((host, port))
+        self.address = self._listener.getsockname()[:2]
+        self._conn = None
+        self._start(device, baud_rate)
+
+    @property
+    def url(self) -> str:
+        return f"tcp://{self.address[0]}:{self.address[1]}"
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(1.0)
+        if self._conn is not None:
+            self._conn.close()
+        self._listener.close()
+
+    def _serve_rx(self) -> None:
+        # nothing can be sent before the client is accepted here
+        while not self._closed:
+            if select.select([self._listener], [], [], 0.1)[0]:
+                self._conn, _ = self._listener.accept()
+                self._conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._master = self._conn.fileno()
+                super()._serve_rx()
+                return
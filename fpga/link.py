@@ -0,0 +1,144 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import neuro
+import numpy as np
+
+from fpga._processor import (
+    BAUDS_PER_BYTE,
+    InpConfig,
+    IoType,
+    OutConfig,
+    comm_limits,
+    target_config,
+)
+from fpga.network import NetworkDescriptor
+
+IO_TYPES = ["DIDO", "DISO", "SIDO", "SISO"]
+
+# chance of each input spiking and each output firing in a timestep, if not given
+DEFAULT_INPUT_RATE = 0.05
+DEFAULT_OUTPUT_RATE = 0.05
+
+
+class LinkPrediction:
+    """Predicted UART usage of a processor with one I/O type.
+
+    Byte counts are averages per timestep in each direction, which run at the same
+    baud rate but independently of one another.
+    """
+
+    def __init__(
+        self,
+        io_type: str,
+        tx_bytes_per_step: float,
+        rx_bytes_per_step: float,
+        bytes_per_sec: float,
+    ):
+        self.io_type = io_type
+        self.tx_bytes_per_step = tx_bytes_per_step
+        self.rx_bytes_per_step = rx_bytes_per_step
+        self.bytes_per_sec = bytes_per_sec
+
+    @property
+    def timesteps_per_sec(self) -> float:
+        busiest = max(self.tx_bytes_per_step, self.rx_bytes_per_step)
+        return self.bytes_per_sec / busiest if busiest else float("inf")
+
+    @property
+    def bottleneck(self) -> str:
+        """Direction which limits the timestep rate, ``"TX"`` or ``"RX"``."""
+        return "TX" if self.tx_bytes_per_step >= self.rx_bytes_per_step else "RX"
+
+    def __repr__(self) -> str:
+        return (
+            f"LinkPrediction({self.io_type}: {self.tx_bytes_per_step:.3g} B TX"
+            + f" and {self.rx_bytes_per_step:.3g} B RX per timestep,"
+            + f" {self.timesteps_per_sec:.4g} timesteps/s limited by"
+            + f" {self.bottleneck})"
+        )
+
+
+def predict_links(
+    net: neuro.Network,
+    target: str,
+    baud_rate: int | None = None,
+    input_rate: float = DEFAULT_INPUT_RATE,
+    output_rate: float = DEFAULT_OUTPUT_RATE,
+    spikes: np.ndarray | None = None,
+    time: int | None = None,
+    run_time: int | None = None,
+    io_types: list[str] = IO_TYPES,
+) -> list[LinkPrediction]:
+    """Predict the UART usage of each I/O type, from fastest to slowest.
+
+    Input traffic is modeled from the chance ``input_rate`` of each input spiking
+    in a timestep, or taken exactly from the packets ``spikes`` would encode to
+    over ``time`` timesteps if they are given (as a structured array like
+    ``fpga.network.SPIKE_DTYPE``). Output traffic is modeled from the chance
+    ``output_rate`` of each output firing in a timestep. If ``run_time`` is given,
+    the SNCs of ``run()`` calls that long are included as well.
+    """
+    uart = target_config(target)["parameters"]["uart"]
+    if baud_rate is None:
+        baud_rate = uart["baud_rates"][-1]
+    desc = NetworkDescriptor(net)
+    if spikes is not None:
+        if time is None:
+            raise ValueError("The time spanned by the spikes must be given.")
+        times, idxs, vals = desc.spikes(spikes)
+        keep = times < time
+        schedule = times[keep], idxs[keep], vals[keep]
+
+    predictions = []
+    for io_type in io_types:
+        io_type = io_type.upper()
+        inp = InpConfig(IoType.DISPATCH if io_type[0] == "D" else IoType.STREAM, desc)
+        out = OutConfig(IoType.DISPATCH if io_type[2] == "D" else IoType.STREAM, desc)
+        max_run = comm_limits(inp, out, uart)[1]
+        syncs = 1 / run_time if run_time else 0.0
+
+        if spikes is not None:
+            pkts, _ = inp.encode(*schedule, time, max_run, begin=0)
+            tx = pkts.size / time
+        elif inp.type == IoType.DISPATCH:
+            tx = inp.cmd_layout.num_bytes * _dispatch_pkts(
+                desc.num_inputs, input_rate, max_run
+            )
+        else:
+            tx = inp.spk_layout.num_bytes
+        if inp.type == IoType.DISPATCH:
+            tx += inp.cmd_layout.num_bytes * syncs
+
+        if out.type == IoType.DISPATCH:
+            # the sink only reports a RUN when an output fires or the count saturates
+            max_report = 2 ** (out.cmd_fmt._infos[1].size) - 1
+            rx = out.cmd_layout.num_bytes * (
+                _dispatch_pkts(desc.num_outputs, output_rate, max_report) + syncs
+            )
+        else:
+            rx = out.spk_layout.num_bytes
+
+        predictions.append(LinkPrediction(io_type, tx, rx, baud_rate / BAUDS_PER_BYTE))
+    # ties go to whichever moves fewer bytes
+    return sorted(
+        predictions,
+        key=lambda p: (-p.timesteps_per_sec, p.tx_bytes_per_step + p.rx_bytes_per_step),
+    )
+
+
+def recommend_io_type(net: neuro.Network, target: str, *args, **kwargs) -> str:
+    """I/O type predicted to run the most timesteps per second.
+
+    Takes the same arguments as ``predict_links()``.
+    """
+    return predict_links(net, target, *args, **kwargs)[0].io_type
+
+
+def _dispatch_pkts(num_io: int, rate: float, max_run: int) -> float:
+    # expected SPK packets plus RUN packets per timestep, where a RUN follows every
+    # timestep with a spike and quiet stretches take one RUN per max_run timesteps
+    busy = 1 - (1 - rate) ** num_io
+    return num_io * rate + max(busy, 1 / max_run)
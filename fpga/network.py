@@ -9,15 +9,20 @@ import re
 from hashlib import sha256
 from json import dumps
 from math import ceil, log10
+from typing import Callable
 from warnings import warn
 
 import neuro
+import numpy as np
 
 import fpga
 from fpga._math import signed_width
 
 HASH_LEN = 10
 
+# fields of a structured array of spikes, as in neuro.Spike
+SPIKE_DTYPE = np.dtype([("id", np.int64), ("time", np.float64), ("value", np.float64)])
+
 
 def charge_width(net: neuro.Network) -> int:
     proc_params = proc_params_dict(net)
@@ -55,6 +60,22 @@ def spike_value_factor(net: neuro.Network) -> float:
     return svf
 
 
+def quantize_charges(values: np.ndarray, factor: float, width: int) -> np.ndarray:
+    """Scale spike values to the input charges a processor sends, truncating them.
+
+    Raises if any charge does not fit in a signed field of ``width`` bits.
+    """
+    charges = (np.asarray(values, dtype=np.float64) * factor).astype(np.int64)
+    if width:
+        bad = (charges < -(1 << (width - 1))) | (charges >= 1 << (width - 1))
+        if np.any(bad):
+            raise ValueError(
+                f"Spike value {np.asarray(values, dtype=np.float64)[bad][0]}"
+                f" does not fit in a charge of {width} bits."
+            )
+    return charges
+
+
 def proc_params_dict(net: neuro.Network) -> dict:
     proc_params = net.get_data("proc_params")
     if type(proc_params) is not dict:
@@ -69,6 +90,159 @@ def proc_name(net: neuro.Network) -> str:
     return other_data["proc_name"]
 
 
+def fire_like_ravens(net: neuro.Network) -> bool:
+    proc_params = proc_params_dict(net)
+    return "fire_like_ravens" in proc_params and bool(proc_params["fire_like_ravens"])
+
+
+def threshold_inclusive(net: neuro.Network) -> bool:
+    proc_params = proc_params_dict(net)
+    return (
+        bool(proc_params["threshold_inclusive"])
+        if ("threshold_inclusive" in proc_params)
+        else True
+    )
+
+
+def min_potential(net: neuro.Network) -> int:
+    proc_params = proc_params_dict(net)
+    min_potential = -1 * proc_params["max_threshold"]
+    if "min_potential" in proc_params:
+        min_potential = proc_params["min_potential"]
+    elif ("non_negative_charge" in proc_params) and proc_params["non_negative_charge"]:
+        warn(
+            "non_negative_charge is a deprecated field; set min_potential to 0 instead."
+        )
+        min_potential = 0
+    if min_potential > 0:
+        raise ValueError("min_potential must be less than or equal to 0")
+    return int(min_potential)
+
+
+def threshold_of(net: neuro.Network) -> Callable[[neuro.Node], int]:
+    thresh_idx = net.get_node_property("Threshold").index
+
+    def thresh(node: neuro.Node) -> int:
+        return int(node.values[thresh_idx])
+
+    return thresh
+
+
+def leak_of(net: neuro.Network) -> Callable[[neuro.Node], int]:
+    proc_params = proc_params_dict(net)
+    leak_mode = proc_params["leak_mode"] if ("leak_mode" in proc_params) else "none"
+    match (leak_mode):
+        case "none":
+
+            def leak(_: neuro.Node) -> int:
+                return 0
+
+        case "all":
+
+            def leak(_: neuro.Node) -> int:
+                return 1
+
+        case "configurable":
+            leak_idx = net.get_node_property("Leak").index
+
+            def leak(node: neuro.Node) -> int:
+                return int(node.values[leak_idx])
+
+        case _:
+            raise ValueError(f'Invalid leak mode: "{leak_mode}"')
+
+    return leak
+
+
+def weight_of(net: neuro.Network) -> Callable[[neuro.Edge], int]:
+    weight_idx = net.get_edge_property("Weight").index
+
+    def weight(edge: neuro.Edge) -> int:
+        return int(edge.values[weight_idx])
+
+    return weight
+
+
+def delay_of(net: neuro.Network) -> Callable[[neuro.Edge], int]:
+    delay_idx = net.get_edge_property("Delay").index
+
+    def delay(edge: neuro.Edge) -> int:
+        return int(edge.values[delay_idx])
+
+    return delay
+
+
+class NetworkDescriptor:
+    """Array-backed summary of a network for converting spikes to charges.
+
+    It is computed once when a network is loaded so that the per-spike work is
+    only array lookups rather than calls into the framework.
+    """
+
+    def __init__(self, net: neuro.Network):
+        self.num_inputs = net.num_inputs()
+        self.num_outputs = net.num_outputs()
+        node_ids = [node_id for node_id in net.nodes()]
+        # input index of each node id, or -1 for nodes which are not inputs
+        self.input_idxs = np.full(max(node_ids, default=-1) + 1, -1, dtype=np.int64)
+        for node_id in node_ids:
+            self.input_idxs[node_id] = net.get_node(node_id).input_id
+        self.spike_value_factor = spike_value_factor(net)
+        self.charge_width = charge_width(net)
+
+    def input_indices(self, node_ids: np.ndarray) -> np.ndarray:
+        """Input index of each node id, raising if any is not an input node."""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        known = (node_ids >= 0) & (node_ids < len(self.input_idxs))
+        idxs = np.full(len(node_ids), -1, dtype=np.int64)
+        idxs[known] = self.input_idxs[node_ids[known]]
+        if np.any(idxs < 0):
+            raise ValueError("Cannot send spikes to non-input node.")
+        return idxs
+
+    def charges(self, values: np.ndarray) -> np.ndarray:
+        """Scale spike values to input charges as in ``quantize_charges()``."""
+        return quantize_charges(values, self.spike_value_factor, self.charge_width)
+
+    def spikes(
+        self,
+        ids: np.ndarray,
+        times: np.ndarray | None = None,
+        values: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Check spikes given as arrays and convert them to timesteps and charges.
+
+        The spikes are parallel arrays of node ids, times and values which broadcast
+        against each other, or ``ids`` alone as a structured array of ``SPIKE_DTYPE``.
+        """
+        if times is None and values is None:
+            spikes = np.asarray(ids)
+            ids, times, values = spikes["id"], spikes["time"], spikes["value"]
+        ids, times, values = np.broadcast_arrays(
+            np.asarray(ids, dtype=np.int64),
+            np.asarray(times, dtype=np.float64),
+            np.asarray(values, dtype=np.float64),
+        )
+        if ids.ndim != 1:
+            raise ValueError("Spikes must be given as one-dimensional arrays.")
+        # NaN times are caught here as well
+        if not np.all(times >= 0):
+            raise RuntimeError("Spikes cannot be scheduled in the past.")
+        return times.astype(np.int64), self.input_indices(ids), self.charges(values)
+
+
+def spike_array(spikes: list[neuro.Spike]) -> np.ndarray:
+    """Structured array of ``SPIKE_DTYPE`` holding the fields of ``spikes``."""
+    arr = np.empty(len(spikes), dtype=SPIKE_DTYPE)
+    for field in SPIKE_DTYPE.names:
+        arr[field] = np.fromiter(
+            (getattr(spike, field) for spike in spikes),
+            SPIKE_DTYPE[field],
+            len(spikes),
+        )
+    return arr
+
+
 def _num_inp_ports(node: neuro.Node) -> int:
     return len(node.incoming) + (1 if (node.input_id > -1) else 0)
 
@@ -88,10 +262,6 @@ def _write_risp_network_sv(f, net: neuro.Network, suffix: str = "") -> None:
     num_inp = net.num_inputs()
     num_out = net.num_outputs()
 
-    fire_like_ravens = (
-        "fire_like_ravens" in proc_params and proc_params["fire_like_ravens"]
-    )
-
     f.write(f"package network{suffix}_config;\n")
     f.write(f"    localparam int CHARGE_WIDTH = {net_charge_width};\n")
     f.write(f"    localparam int NUM_INP = {num_inp};\n")
@@ -117,48 +287,11 @@ def _write_risp_network_sv(f, net: neuro.Network, suffix: str = "") -> None:
     def neur_id(node_id: int) -> str:
         return f"{node_id:0{neur_id_digits}d}"
 
-    thresh_idx = net.get_node_property("Threshold").index
-
-    def thresh(node: neuro.Node) -> int:
-        return int(node.values[thresh_idx])
-
-    thresh_incl = (
-        proc_params["threshold_inclusive"]
-        if ("threshold_inclusive" in proc_params)
-        else True
-    )
-
-    min_potential = -1 * proc_params["max_threshold"]
-    if "min_potential" in proc_params:
-        min_potential = proc_params["min_potential"]
-    elif ("non_negative_charge" in proc_params) and proc_params["non_negative_charge"]:
-        warn(
-            "non_negative_charge is a deprecated field; set min_potential to 0 instead."
-        )
-        min_potential = 0
-    if min_potential > 0:
-        raise ValueError("min_potential must be less than or equal to 0")
-
-    leak_mode = proc_params["leak_mode"] if ("leak_mode" in proc_params) else "none"
-    match (leak_mode):
-        case "none":
-
-            def leak(_: neuro.Node) -> int:
-                return 0
-
-        case "all":
-
-            def leak(_: neuro.Node) -> int:
-                return 1
-
-        case "configurable":
-            leak_idx = net.get_node_property("Leak").index
-
-            def leak(node: neuro.Node) -> int:
-                return int(node.values[leak_idx])
-
-        case _:
-            raise ValueError(f'Invalid leak mode: "{leak_mode}"')
+    thresh = threshold_of(net)
+    thresh_incl = threshold_inclusive(net)
+    potential_min = min_potential(net)
+    leak = leak_of(net)
+    ravens = fire_like_ravens(net)
 
     # end formatting functions
 
@@ -191,9 +324,9 @@ def _write_risp_network_sv(f, net: neuro.Network, suffix: str = "") -> None:
         f.write(f"        .LEAK({leak(node)}),\n")
         f.write(f"        .NUM_INP({num_inp_ports}),\n")
         f.write(f"        .CHARGE_WIDTH(CHARGE_WIDTH),\n")
-        f.write(f"        .POTENTIAL_MIN({int(min_potential)}),\n")
+        f.write(f"        .POTENTIAL_MIN({potential_min}),\n")
         f.write(f"        .THRESHOLD_INCLUSIVE({int(thresh_incl)}),\n")
-        f.write(f"        .FIRE_LIKE_RAVENS({int(fire_like_ravens)})\n")
+        f.write(f"        .FIRE_LIKE_RAVENS({int(ravens)})\n")
         f.write(f"    ) neur_{neur_id(node.id)} (\n")
         f.write(f"        .clk,\n")
         f.write(f"        .arstn,\n")
@@ -210,15 +343,8 @@ def _write_risp_network_sv(f, net: neuro.Network, suffix: str = "") -> None:
 
         f.write(f"    //  End  Neuron {neur_id(node.id)}\n\n")
 
-    weight_idx = net.get_edge_property("Weight").index
-
-    def weight(edge: neuro.Edge) -> int:
-        return int(edge.values[weight_idx])
-
-    delay_idx = net.get_edge_property("Delay").index
-
-    def delay(edge: neuro.Edge) -> int:
-        return int(edge.values[delay_idx])
+    weight = weight_of(net)
+    delay = delay_of(net)
 
     for n in net.nodes():
         node = net.get_node(n)
@@ -233,7 +359,7 @@ def _write_risp_network_sv(f, net: neuro.Network, suffix: str = "") -> None:
             f.write(f"        .WEIGHT({weight(inp)}),\n")
             f.write(f"        .DELAY({delay(inp)}),\n")
             f.write(f"        .CHARGE_WIDTH(CHARGE_WIDTH),\n")
-            f.write(f"        .FIRE_LIKE_RAVENS({int(fire_like_ravens)})\n")
+            f.write(f"        .FIRE_LIKE_RAVENS({int(ravens)})\n")
             f.write(f"    ) syn_{neur_id(inp.pre.id)}_{neur_id(inp.post.id)} (\n")
             f.write(f"        .clk,\n")
             f.write(f"        .arstn,\n")
@@ -0,0 +1,302 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import mmap
+import os
+from time import perf_counter
+
+import neuro
+import numpy as np
+
+from fpga._capture import RECORD_DATA_BYTES, RUN_DTYPE, CaptureKind, read_capture
+from fpga._processor import IoType, OutConfig
+from fpga.emulator import Emulator
+from fpga.network import HASH_LEN, SPIKE_DTYPE, NetworkDescriptor, hash_network
+
+# number of arguments taken by each command
+COMMAND_ARITY = {b"AS": 3, b"RUN": 1, b"CA": 0}
+# names are compared up to one byte past the longest, so longer ones never match
+NAME_WIDTH = max(len(name) for name in COMMAND_ARITY) + 1
+
+# whether each byte separates tokens, as in bytes.split(), or begins a name
+_IS_SPACE = np.zeros(256, dtype=bool)
+_IS_SPACE[list(b" \t\n\r\v\f")] = True
+_IS_ALPHA = np.zeros(256, dtype=bool)
+_IS_ALPHA[list(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")] = True
+
+
+def parse_commands(
+    data: bytes | mmap.mmap,
+) -> list[tuple[str, np.ndarray | int | None]]:
+    """Parse processor commands of the framework into steps to replay.
+
+    Only the commands which drive a processor are understood: ``AS id time value``,
+    ``RUN time`` and ``CA``, which become ``("AS", spikes)``, ``("RUN", time)`` and
+    ``("CA", None)`` steps respectively. Consecutive ``AS`` commands are gathered
+    into one structured array of ``fpga.network.SPIKE_DTYPE`` to be applied at once.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    # tokens run from where the bytes stop being whitespace to where they resume
+    edges = np.diff(np.concatenate([[1], _IS_SPACE[buf], [1]]).astype(np.int8))
+    firsts = np.flatnonzero(edges == -1)
+    lens = np.flatnonzero(edges == 1) - firsts
+    if not len(firsts):
+        return []
+    starts = np.flatnonzero(_IS_ALPHA[buf[firsts]])
+    if not len(starts) or starts[0] != 0:
+        raise ValueError("Commands must begin with a command name.")
+    names = _gather(buf, firsts[starts], lens[starts], NAME_WIDTH)
+    num_args = np.diff(starts, append=len(firsts)) - 1
+    for name in np.unique(names):
+        if name not in COMMAND_ARITY:
+            raise ValueError(f"Unknown command {name.decode()}.")
+        bad = np.flatnonzero((names == name) & (num_args != COMMAND_ARITY[name]))
+        if len(bad):
+            raise ValueError(
+                f"Command {bad[0]} ({name.decode()}) takes"
+                + f" {COMMAND_ARITY[name]} arguments but was given {num_args[bad[0]]}."
+            )
+
+    # the arguments of every command of a kind are converted at once
+    is_spike = names == b"AS"
+    is_run = names == b"RUN"
+    spikes = np.empty(int(is_spike.sum()), dtype=SPIKE_DTYPE)
+    for offset, field in enumerate(SPIKE_DTYPE.names, 1):
+        args = starts[is_spike] + offset
+        spikes[field] = _gather(buf, firsts[args], lens[args]).astype(
+            SPIKE_DTYPE[field]
+        )
+    args = starts[is_run] + 1
+    run_times = _gather(buf, firsts[args], lens[args]).astype(np.int64)
+    # number of commands of each kind before every command
+    num_spikes = np.cumsum(is_spike) - is_spike
+    num_runs = np.cumsum(is_run) - is_run
+
+    steps = []
+    # every other command splits the spikes into blocks
+    others = np.flatnonzero(~is_spike)
+    for first, stop in zip(np.append(0, others + 1), np.append(others, len(names))):
+        if stop > first:
+            begin = num_spikes[first]
+            steps.append(("AS", spikes[begin : begin + stop - first]))
+        if stop < len(names):
+            match names[stop]:
+                case b"RUN":
+                    steps.append(("RUN", int(run_times[num_runs[stop]])))
+                case b"CA":
+                    steps.append(("CA", None))
+    return steps
+
+
+def read_commands(
+    path: str | os.PathLike,
+) -> list[tuple[str, np.ndarray | int | None]]:
+    """Read and parse a command file as in ``parse_commands()``.
+
+    The file is memory-mapped rather than read into a copy first.
+    """
+    with open(path, "rb") as f:
+        # empty files cannot be mapped
+        if not os.fstat(f.fileno()).st_size:
+            return []
+        # unmapped once nothing refers to it, as closing it fails while viewed
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return parse_commands(data)
+
+
+def _gather(
+    buf: np.ndarray, firsts: np.ndarray, lens: np.ndarray, width: int | None = None
+) -> np.ndarray:
+    # copy tokens into byte strings of a fixed width, truncating any longer ones
+    if width is None:
+        width = int(lens.max(initial=1))
+    cols = np.arange(width)
+    chars = np.zeros((len(firsts), width), dtype=np.uint8)
+    keep = cols < lens[:, None]
+    chars[keep] = buf[(firsts[:, None] + cols)[keep]]
+    return chars.view(f"S{width}").ravel()
+
+
+class ReplayStats:
+    """End-to-end measurements of a replay."""
+
+    def __init__(
+        self,
+        secs: float,
+        timesteps: int,
+        spikes: int,
+        bytes_sent: int | None,
+        bytes_received: int | None,
+        fire_counts: list[int],
+    ):
+        self.secs = secs
+        self.timesteps = timesteps
+        self.spikes = spikes
+        # None for processors without a wire, e.g. fpga.SimProcessor
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.fire_counts = fire_counts
+
+    @property
+    def timesteps_per_sec(self) -> float:
+        return self.timesteps / self.secs if self.secs else 0.0
+
+    @property
+    def spikes_per_sec(self) -> float:
+        return self.spikes / self.secs if self.secs else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "secs": self.secs,
+            "timesteps": self.timesteps,
+            "spikes": self.spikes,
+            "timesteps_per_sec": self.timesteps_per_sec,
+            "spikes_per_sec": self.spikes_per_sec,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "fire_counts": self.fire_counts,
+        }
+
+
+def replay(
+    proc: neuro.Processor, steps: list[tuple[str, np.ndarray | int | None]]
+) -> ReplayStats:
+    """Drive a processor with a network already loaded through parsed commands.
+
+    The processor must support ``apply_spike_arrays()``, as ``fpga.Processor``
+    and ``fpga.SimProcessor`` do. Fires are counted per output over every run.
+    """
+    bytes_sent = getattr(proc, "bytes_sent", None)
+    bytes_received = getattr(proc, "bytes_received", None)
+    timesteps = 0
+    spikes = 0
+    fire_counts = None
+    start = perf_counter()
+    for command, arg in steps:
+        match command:
+            case "AS":
+                proc.apply_spike_arrays(arg)
+                spikes += len(arg)
+            case "RUN":
+                proc.run(arg)
+                timesteps += arg
+                counts = np.asarray(proc.output_counts(), dtype=np.int64)
+                fire_counts = counts if fire_counts is None else fire_counts + counts
+            case "CA":
+                proc.clear_activity()
+            case _:
+                raise ValueError(f"Unknown command {command}.")
+    secs = perf_counter() - start
+
+    return ReplayStats(
+        secs,
+        timesteps,
+        spikes,
+        None if bytes_sent is None else proc.bytes_sent - bytes_sent,
+        None if bytes_received is None else proc.bytes_received - bytes_received,
+        [] if fire_counts is None else fire_counts.tolist(),
+    )
+
+
+def replay_capture(
+    net: neuro.Network, path: str | os.PathLike, emulate: bool = False
+) -> ReplayStats:
+    """Decode the output captured from a processor as fast as possible.
+
+    Each run is decoded as the processor did, so the fire counts match those of
+    the original session and the time taken measures only the decoder. With
+    ``emulate``, the captured input is fed to an ``fpga.emulator.Emulator``
+    instead and its output is decoded in place of the captured output, to tell
+    whether the target behaved like the model. Input spikes are not captured,
+    so none are counted.
+    """
+    records = read_capture(path)
+    if not len(records) or records["kind"][0] != CaptureKind.HEADER:
+        raise ValueError("A capture must begin with a header.")
+    net_hash = hash_network(net, HASH_LEN)
+    desc = NetworkDescriptor(net)
+    fire_counts = np.zeros(desc.num_outputs, dtype=np.int64)
+    timesteps = 0
+    bytes_sent = 0
+    bytes_received = 0
+
+    # consecutive chunks of the same kind are handled at once
+    kinds = records["kind"].astype(np.int64)
+    starts = np.flatnonzero(np.diff(kinds, prepend=-1) | (kinds > CaptureKind.RX))
+    valid = np.arange(RECORD_DATA_BYTES) < records["size"][:, None]
+    out = None
+    # whether activity is being cleared, whose output is not kept
+    clearing = False
+
+    start = perf_counter()
+    for first, stop in zip(starts, np.append(starts[1:], len(records))):
+        data = records["data"][first:stop][valid[first:stop]].tobytes()
+        match kinds[first]:
+            case CaptureKind.HEADER:
+                io_type, header_hash = data[:4].decode(), data[4:].decode()
+                if header_hash != net_hash:
+                    raise ValueError("The capture is of a different network.")
+                if out is not None and not clearing:
+                    fire_counts += out.queue.lens
+                inp_type = IoType.DISPATCH if io_type[0] == "D" else IoType.STREAM
+                out = OutConfig(
+                    IoType.DISPATCH if io_type[2] == "D" else IoType.STREAM, desc
+                )
+                out.clear()
+                device = Emulator(net, io_type) if emulate else None
+                target = 0
+                clearing = False
+            case CaptureKind.RUN:
+                if clearing:
+                    out.clear()
+                    clearing = False
+                run = np.frombuffer(data, dtype=RUN_DTYPE)[0]
+                target = int(run["target"])
+                timesteps += int(run["timesteps"])
+                out.in_episodes = bool(run["episodes"])
+            case CaptureKind.CLR:
+                if not clearing:
+                    fire_counts += out.queue.lens
+                clearing = True
+                out.in_episodes = False
+                # only a dispatch sink answers a dispatched CLR, which is sought
+                seek_clr = inp_type == out.type == IoType.DISPATCH
+                if not seek_clr:
+                    out.pending.clear()
+            case CaptureKind.TX:
+                bytes_sent += len(data)
+                if device is not None:
+                    device.write(data)
+                    rx = device.read()
+                    if not clearing or seek_clr:
+                        _decode(out, rx, target, inp_type, clearing)
+            case CaptureKind.RX:
+                bytes_received += len(data)
+                if device is None:
+                    _decode(out, data, target, inp_type, clearing)
+            case _:
+                raise ValueError(f"Unknown capture record kind {kinds[first]}.")
+    secs = perf_counter() - start
+    if not clearing:
+        fire_counts += out.queue.lens
+
+    return ReplayStats(
+        secs, timesteps, 0, bytes_sent, bytes_received, fire_counts.tolist()
+    )
+
+
+def _decode(
+    out: OutConfig, data: bytes, target: int, inp_type: IoType, seek_clr: bool
+) -> None:
+    # decode every whole packet as fpga.Processor._rx_decode() does
+    out.pending.extend(data)
+    pkt_bytes = out.spk_layout.num_bytes
+    if num_pkts := len(out.pending) // pkt_bytes:
+        pkts = np.frombuffer(out.pending, np.uint8, num_pkts * pkt_bytes)
+        used, _ = out.decode(
+            pkts.reshape(num_pkts, pkt_bytes), target, inp_type, seek_clr
+        )
+        del pkts
+        del out.pending[: used * pkt_bytes]
@@ -0,0 +1,400 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+from typing import Iterable
+
+import neuro
+import numpy as np
+
+from fpga.network import (
+    charge_width,
+    delay_of,
+    fire_like_ravens,
+    leak_of,
+    min_potential,
+    proc_name,
+    quantize_charges,
+    spike_value_factor,
+    threshold_inclusive,
+    threshold_of,
+    weight_of,
+)
+
+# below this fraction of connected neuron pairs, synapses are delivered sparsely
+SPARSE_DENSITY = 0.05
+
+
+class RispNetwork:
+    """Array form of a network with the parameters of the generated RTL.
+
+    Neurons are indexed in ascending node ID order, matching the generation order of
+    ``risp_neuron`` instances in ``build_network_sv()``.
+    """
+
+    def __init__(self, net: neuro.Network):
+        if proc_name(net) != "risp":
+            raise NotImplementedError(
+                f"The {proc_name(net).upper()} processor is not yet supported."
+            )
+
+        node_ids = sorted(net.nodes())
+        neur_idx = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.num_neurons = len(node_ids)
+        self.num_inputs = net.num_inputs()
+        self.num_outputs = net.num_outputs()
+
+        thresh = threshold_of(net)
+        leak = leak_of(net)
+        weight = weight_of(net)
+        delay = delay_of(net)
+
+        thresh_excl = int(not threshold_inclusive(net))
+        potential_min = min_potential(net)
+        self.fire_like_ravens = fire_like_ravens(net)
+        # equivalents of the FUSE_START and FUSE_MAX localparams in risp_neuron
+        self.fuse_start = np.empty(self.num_neurons, dtype=np.int64)
+        self.leak = np.empty(self.num_neurons, dtype=bool)
+        self.inp_neurons = np.empty(self.num_inputs, dtype=np.int64)
+        self.out_neurons = np.empty(self.num_outputs, dtype=np.int64)
+        pre, post, weights, delays = [], [], [], []
+        for node_id in node_ids:
+            node = net.get_node(node_id)
+            i = neur_idx[node_id]
+            self.fuse_start[i] = thresh(node) + thresh_excl
+            self.leak[i] = bool(leak(node))
+            if node.input_id > -1:
+                self.inp_neurons[node.input_id] = i
+            if node.output_id > -1:
+                self.out_neurons[node.output_id] = i
+            for edge in node.incoming:
+                if delay(edge) < 1:
+                    raise ValueError(
+                        f"Synapse {edge.pre.id}->{edge.post.id} has a delay of"
+                        f" {delay(edge)} which would form a combinational loop."
+                    )
+                pre.append(neur_idx[edge.pre.id])
+                post.append(i)
+                weights.append(weight(edge))
+                delays.append(delay(edge))
+
+        self.fuse_max = self.fuse_start - potential_min
+        # the fuse register is unsigned, so a non-positive FUSE_START wraps on reset
+        fuse_width = np.array([int(m).bit_length() for m in self.fuse_max])
+        self.fuse_reset = self.fuse_start % (np.int64(1) << fuse_width)
+
+        # synapses sorted by presynaptic neuron so fires can gather a contiguous slice
+        order = np.argsort(np.asarray(pre, dtype=np.int64), kind="stable")
+        self.pre = np.asarray(pre, dtype=np.int64)[order]
+        self.post = np.asarray(post, dtype=np.int64)[order]
+        self.weight = np.asarray(weights, dtype=np.int64)[order]
+        self.delay = np.asarray(delays, dtype=np.int64)[order]
+        self.pre_offsets = np.searchsorted(self.pre, np.arange(self.num_neurons + 1))
+        self.delays = np.unique(self.delay)
+        self.max_delay = int(self.delays[-1]) if len(self.delays) else 0
+        # output index of every neuron, or -1 for non-output neurons
+        self.out_idx = np.full(self.num_neurons, -1, dtype=np.int64)
+        self.out_idx[self.out_neurons] = np.arange(self.num_outputs)
+
+    def synapses_of(self, neurons: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Indices of all synapses leaving ``neurons`` and their count per neuron."""
+        starts = self.pre_offsets[neurons]
+        counts = self.pre_offsets[neurons + 1] - starts
+        syn = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(
+            counts.sum()
+        )
+        return syn, counts
+
+    def density(self) -> float:
+        """Fraction of all possible neuron pairs connected by a synapse."""
+        return len(self.weight) / max(1, self.num_neurons**2)
+
+    def dense_weights(self) -> np.ndarray:
+        """Weight matrices indexed ``[delay, pre, post]`` for each of ``delays``."""
+        weights = np.zeros(
+            (len(self.delays), self.num_neurons, self.num_neurons), dtype=np.float64
+        )
+        weights[np.searchsorted(self.delays, self.delay), self.pre, self.post] = (
+            self.weight
+        )
+        return weights
+
+    def spike_raster(
+        self, net: neuro.Network, spikes: Iterable[neuro.Spike], timesteps: int
+    ) -> np.ndarray:
+        """Quantize spikes into input charges indexed ``[time, input]``.
+
+        Spikes are scaled and truncated exactly as the processor does before sending
+        them, and the last of several spikes on one input at one time wins.
+        """
+        raster = np.zeros((timesteps, self.num_inputs), dtype=np.int64)
+        spikes = [s for s in spikes if 0 <= int(s.time) < timesteps]
+        if not spikes:
+            return raster
+        inp_ids = np.array([net.get_node(s.id).input_id for s in spikes])
+        if np.any(inp_ids < 0):
+            raise ValueError("Cannot send spikes to non-input node.")
+        times = np.array([int(s.time) for s in spikes])
+        values = quantize_charges(
+            [s.value for s in spikes], spike_value_factor(net), charge_width(net)
+        )
+        # keep only the final occurrence of each (time, input) pair
+        keys = times * self.num_inputs + inp_ids
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        raster[times[last], inp_ids[last]] = values[last]
+        return raster
+
+
+class RispSim:
+    """Timestep-accurate model of the ``network`` module generated for a RISP net.
+
+    Each call to ``step()`` corresponds to one enabled clock cycle of the network for
+    ``batch_size`` independent episodes at once. Neuron state is kept as the RTL
+    "fuse", i.e. ``FUSE_START - potential``, and synaptic charge is scheduled into a
+    ring buffer indexed by arrival time, either through per-delay weight matrices
+    (dense) or by gathering the synapses of fired neurons (sparse).
+    """
+
+    def __init__(
+        self, model: RispNetwork, batch_size: int = 1, sparse: bool | None = None
+    ):
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.model = model
+        self.batch_size = batch_size
+        self.sparse = model.density() < SPARSE_DENSITY if sparse is None else sparse
+        self._weights = None if self.sparse else model.dense_weights()
+        self.clear()
+
+    def clear(self) -> None:
+        """Equivalent of asserting the network reset in every episode."""
+        model = self.model
+        shape = (self.batch_size, model.num_neurons)
+        self.time = 0
+        self.fuse = np.broadcast_to(model.fuse_reset, shape).copy()
+        # charge arriving at each neuron, indexed by time modulo length
+        self._arrivals = np.zeros((model.max_delay + 1,) + shape, dtype=np.int64)
+        # FIRE_LIKE_RAVENS registers the fire output of every neuron
+        self._fire_reg = np.zeros(shape, dtype=bool)
+
+    def step(self, inp: np.ndarray) -> np.ndarray:
+        """Run one timestep with integer input charges, returning fired outputs.
+
+        ``inp`` is indexed ``[episode, input]``; a single ``[input]`` row is applied
+        to every episode, and for a batch size of 1 yields a single row of outputs.
+        """
+        model = self.model
+        inp = np.asarray(inp)
+        slot = self.time % len(self._arrivals)
+        charge = self._arrivals[slot].copy()
+        self._arrivals[slot] = 0
+        charge[:, model.inp_neurons] += inp
+
+        fuse = np.where(model.leak, model.fuse_start, self.fuse) - charge
+        do_fire = fuse <= 0
+        self.fuse = np.where(
+            do_fire, model.fuse_reset, np.minimum(fuse, model.fuse_max)
+        )
+
+        # synapse delays are shortened by one when fires are registered,
+        # so charge always arrives DELAY timesteps after the neuron crossed threshold
+        if self.sparse:
+            self._deliver_sparse(do_fire)
+        else:
+            self._deliver_dense(do_fire)
+
+        if model.fire_like_ravens:
+            fire, self._fire_reg = self._fire_reg, do_fire
+        else:
+            fire = do_fire
+        self.time += 1
+        out = fire[:, model.out_neurons]
+        return out[0] if (inp.ndim == 1 and self.batch_size == 1) else out
+
+    def run(self, inputs: np.ndarray) -> np.ndarray:
+        """Step through charges indexed ``[time, episode, input]``.
+
+        Returns the fired outputs indexed ``[time, episode, output]``.
+        """
+        fires = np.empty(
+            (len(inputs), self.batch_size, self.model.num_outputs), dtype=bool
+        )
+        for t in range(len(inputs)):
+            fires[t] = self.step(inputs[t])
+        return fires
+
+    def _deliver_dense(self, do_fire: np.ndarray) -> None:
+        fired = do_fire.astype(np.float64)
+        for weights, delay in zip(self._weights, self.model.delays):
+            # float products of small integers are exact and let BLAS do the work
+            self._arrivals[(self.time + delay) % len(self._arrivals)] += (
+                fired @ weights
+            ).astype(np.int64)
+
+    def _deliver_sparse(self, do_fire: np.ndarray) -> None:
+        model = self.model
+        episodes, fired = np.nonzero(do_fire)
+        syn, counts = model.synapses_of(fired)
+        if not len(syn):
+            return
+        np.add.at(
+            self._arrivals,
+            (
+                (self.time + model.delay[syn]) % len(self._arrivals),
+                np.repeat(episodes, counts),
+                model.post[syn],
+            ),
+            model.weight[syn],
+        )
+
+
+class EventSim:
+    """Event-driven model of the ``network`` module generated for a RISP net.
+
+    Neurons are only evaluated on timesteps when they receive charge, since without
+    charge a neuron can neither fire nor change its fuse (a leaking neuron's fuse is
+    never read). Synaptic charge is scheduled on a timing wheel one slot longer than
+    the maximum delay, and timesteps without any scheduled charge or input are
+    skipped, so the cost of ``run()`` scales with events rather than timesteps.
+    """
+
+    def __init__(self, model: RispNetwork):
+        self.model = model
+        # neurons with a non-positive fuse fire with no charge at all
+        self._spontaneous = np.flatnonzero(
+            (np.where(model.leak, model.fuse_start, model.fuse_reset) <= 0)
+            | (model.fuse_max <= 0)
+        )
+        self.clear()
+
+    def clear(self) -> None:
+        """Equivalent of asserting the network reset."""
+        self.time = 0
+        self.fuse = self.model.fuse_reset.copy()
+        # each slot holds (neuron, charge) array pairs to be summed on arrival
+        self._wheel = [[] for _ in range(self.model.max_delay + 1)]
+        # FIRE_LIKE_RAVENS reports output fires one timestep late
+        self._late_times = np.empty(0, dtype=np.int64)
+        self._late_idxs = np.empty(0, dtype=np.int64)
+
+    def run(
+        self,
+        timesteps: int,
+        times: np.ndarray,
+        idxs: np.ndarray,
+        charges: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Run for ``timesteps`` with the given input events.
+
+        Input events are given as parallel arrays of absolute times (sorted
+        ascending and within this run), input indices and integer charges, with at
+        most one event per input per timestep. Returns the output fires as parallel
+        arrays of absolute times and output indices in order of time then index.
+        """
+        model = self.model
+        end = self.time + timesteps
+        fire_times, fire_idxs = [], []
+
+        late = self._late_times < end
+        fire_times.append(self._late_times[late])
+        fire_idxs.append(self._late_idxs[late])
+        self._late_times = self._late_times[~late]
+        self._late_idxs = self._late_idxs[~late]
+
+        i = 0
+        while True:
+            t = self._next_active(times[i] if i < len(times) else end, end)
+            if t >= end:
+                break
+            self.time = t
+            j = i + np.searchsorted(times[i:], t, side="right")
+            fired = self._step(model.inp_neurons[idxs[i:j]], charges[i:j])
+            i = j
+
+            out = model.out_idx[fired]
+            out = np.sort(out[out >= 0])
+            if model.fire_like_ravens:
+                if t + 1 < end:
+                    fire_times.append(np.full(len(out), t + 1))
+                    fire_idxs.append(out)
+                else:
+                    self._late_times = np.full(len(out), t + 1)
+                    self._late_idxs = out
+            else:
+                fire_times.append(np.full(len(out), t))
+                fire_idxs.append(out)
+            self.time = t + 1
+
+        self.time = end
+        return np.concatenate(fire_times).astype(np.int64), np.concatenate(
+            fire_idxs
+        ).astype(np.int64)
+
+    def _next_active(self, next_inp: int, end: int) -> int:
+        if len(self._spontaneous):
+            return self.time
+        for dt in range(min(len(self._wheel), next_inp - self.time)):
+            if self._wheel[(self.time + dt) % len(self._wheel)]:
+                return self.time + dt
+        return min(next_inp, end)
+
+    def _step(self, inp_neurons: np.ndarray, inp_charges: np.ndarray) -> np.ndarray:
+        model = self.model
+        slot = self.time % len(self._wheel)
+        arrivals = self._wheel[slot]
+        self._wheel[slot] = []
+        neurons = np.concatenate(
+            [inp_neurons, self._spontaneous] + [n for n, _ in arrivals]
+        )
+        charges = np.concatenate(
+            [inp_charges, np.zeros(len(self._spontaneous), dtype=np.int64)]
+            + [c for _, c in arrivals]
+        )
+        neurons, inv = np.unique(neurons, return_inverse=True)
+        # float sums of small integers are exact
+        charge = np.bincount(inv, weights=charges).astype(np.int64)
+
+        fuse = np.where(
+            model.leak[neurons], model.fuse_start[neurons], self.fuse[neurons]
+        )
+        fuse -= charge
+        do_fire = fuse <= 0
+        self.fuse[neurons] = np.where(
+            do_fire,
+            model.fuse_reset[neurons],
+            np.minimum(fuse, model.fuse_max[neurons]),
+        )
+
+        fired = neurons[do_fire]
+        syn, _ = model.synapses_of(fired)
+        if len(syn):
+            delays = model.delay[syn]
+            order = np.argsort(delays, kind="stable")
+            syn = syn[order]
+            delays = delays[order]
+            bounds = np.flatnonzero(np.diff(delays)) + 1
+            for group in np.split(np.arange(len(syn)), bounds):
+                self._wheel[(self.time + delays[group[0]]) % len(self._wheel)].append(
+                    (model.post[syn[group]], model.weight[syn[group]])
+                )
+        return fired
+
+
+def simulate_episodes(
+    net: neuro.Network,
+    episodes: list[Iterable[neuro.Spike]],
+    timesteps: int,
+    sparse: bool | None = None,
+) -> np.ndarray:
+    """Run every episode of spikes from a cleared network in one vectorized pass.
+
+    Returns the fired outputs indexed ``[episode, time, output]``.
+    """
+    model = RispNetwork(net)
+    sim = RispSim(model, len(episodes), sparse)
+    inputs = np.stack(
+        [model.spike_raster(net, spikes, timesteps) for spikes in episodes], axis=1
+    )
+    return sim.run(inputs).transpose(1, 0, 2)
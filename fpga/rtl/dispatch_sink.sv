@@ -119,6 +119,16 @@ module network_sink #(
         end
     end
 
+    // the index field of a single-output network has no width, so it must not be
+    // elaborated at all rather than skipped at run time
+    logic [RUN_WIDTH-1:0] spk_operand;
+    generate
+        if (SPK_WIDTH == 0)
+            assign spk_operand = 0;
+        else
+            assign spk_operand = RUN_WIDTH'(NUM_OUT - fire_counter) << (RUN_WIDTH - SPK_WIDTH);
+    endgenerate
+
     always_comb begin: calc_snk
         snk = 0;
         snk_valid = 0;
@@ -134,8 +144,7 @@ module network_sink #(
             end
             SPKS: begin
                 snk[(PKT_WIDTH - 1) -: PFX_WIDTH] = SPK;
-                if (SPK_WIDTH > 0)
-                    snk[(PKT_WIDTH - PFX_WIDTH - 1) -: SPK_WIDTH] = NUM_OUT - fire_counter;
+                snk[PKT_WIDTH - PFX_WIDTH - 1 : 0] = spk_operand;
                 snk_valid = fires[NUM_OUT - fire_counter];
             end
             SYNC: begin
@@ -0,0 +1,229 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import argparse
+import multiprocessing as mp
+import pathlib as pl
+import platform
+import subprocess
+from datetime import datetime, timezone
+from json import dumps, loads
+from statistics import median
+from time import process_time
+
+import neuro
+
+import fpga
+from fpga.emulator import Emulator, PtyServer
+from fpga.replay import read_commands, replay
+from fpga.transport import LoopbackTransport
+
+IO_TYPES = ["DIDO", "DISO", "SIDO", "SISO"]
+
+
+def _serve(net_path: str, io_type: str, baud_rate: int | None, conn) -> None:
+    # the emulator runs in its own process so that it is not billed as host CPU
+    net = neuro.Network()
+    net.read_from_file(net_path)
+    with PtyServer(Emulator(net, io_type), baud_rate) as server:
+        conn.send(server.path)
+        # serve until the benchmark is done with it
+        conn.recv()
+
+
+def _bench(
+    net: neuro.Network,
+    net_path: pl.Path,
+    io_type: str,
+    steps: list,
+    baud_rate: int | None,
+    loopback: bool = False,
+) -> dict:
+    if loopback:
+        proc = fpga.Processor(
+            "emulator", LoopbackTransport(Emulator(net, io_type)), io_type
+        )
+        proc.load_network(net)
+        cpu = process_time()
+        stats = replay(proc, steps)
+        cpu = process_time() - cpu
+    else:
+        conn, child_conn = mp.Pipe()
+        server = mp.Process(
+            target=_serve, args=(str(net_path), io_type, baud_rate, child_conn)
+        )
+        server.start()
+        try:
+            proc = fpga.Processor("emulator", conn.recv(), io_type)
+            proc.load_network(net)
+            cpu = process_time()
+            stats = replay(proc, steps)
+            cpu = process_time() - cpu
+            proc._interface.close()
+        finally:
+            conn.send(None)
+            server.join()
+    return {
+        "wall_secs": stats.secs,
+        "cpu_secs": cpu,
+        "bytes_sent": stats.bytes_sent,
+        "bytes_received": stats.bytes_received,
+        "timesteps_per_sec": stats.timesteps_per_sec,
+        "spikes_per_sec": stats.spikes_per_sec,
+        "fires": sum(stats.fire_counts),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _last_results(history: pl.Path, transport: str) -> dict:
+    # latest record of each case on this host over the same transport
+    last = {}
+    if history.exists():
+        for line in history.read_text().splitlines():
+            record = loads(line)
+            if (
+                record["host"] == platform.node()
+                and record.get("transport", "pty") == transport
+            ):
+                last[(record["workload"], record["io_type"])] = record
+    return last
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="fpga-bench", description="Emulated Processor Benchmarks"
+    )
+    parser.add_argument(
+        "-n",
+        dest="network",
+        type=pl.Path,
+        default=pl.Path("dbscan_example/dbscan-20-4-5.txt"),
+        help="JSON network filepath (defaults to the DBSCAN example)",
+    )
+    parser.add_argument(
+        "-w",
+        dest="workloads",
+        type=pl.Path,
+        nargs="+",
+        default=[
+            pl.Path("dbscan_example/input_112.txt"),
+            pl.Path("dbscan_example/input_all.txt"),
+        ],
+        help="Command files to replay (defaults to the DBSCAN example inputs)",
+    )
+    parser.add_argument(
+        "-i",
+        dest="io_types",
+        type=str,
+        nargs="+",
+        default=IO_TYPES,
+        help="Processor I/O types (defaults to all four)",
+    )
+    parser.add_argument(
+        "-r",
+        dest="repeat",
+        type=int,
+        default=3,
+        help="Number of times to run each case, keeping the median (defaults to 3)",
+    )
+    parser.add_argument(
+        "-b",
+        dest="baud_rate",
+        type=int,
+        default=None,
+        help="Emulated baud rate (defaults to unlimited)",
+    )
+    parser.add_argument(
+        "-l",
+        dest="loopback",
+        action="store_true",
+        help="Emulate in memory without a pty or baud rate, billing it as host CPU",
+    )
+    parser.add_argument(
+        "-o",
+        dest="history",
+        type=pl.Path,
+        default=pl.Path("bench.jsonl"),
+        help="JSON Lines file the results are appended to (defaults to bench.jsonl)",
+    )
+    args = parser.parse_args()
+
+    net = neuro.Network()
+    net.read_from_file(str(args.network))
+    transport = "loopback" if args.loopback else "pty"
+    last = _last_results(args.history, transport)
+    common = {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "network": args.network.name,
+        "baud_rate": None if args.loopback else args.baud_rate,
+        "transport": transport,
+    }
+
+    records = []
+    print(
+        f"{'workload':<16}{'I/O':<6}{'wall s':>9}{'cpu s':>9}{'TX B':>9}{'RX B':>9}"
+        + f"{'steps/s':>10}{'vs last':>9}"
+    )
+    for workload in args.workloads:
+        steps = read_commands(workload)
+        for io_type in args.io_types:
+            io_type = io_type.upper()
+            runs = [
+                _bench(net, args.network, io_type, steps, args.baud_rate, args.loopback)
+                for _ in range(args.repeat)
+            ]
+            result = {
+                key: median(run[key] for run in runs)
+                for key in [
+                    "wall_secs",
+                    "cpu_secs",
+                    "timesteps_per_sec",
+                    "spikes_per_sec",
+                ]
+            }
+            record = {
+                **common,
+                "workload": workload.name,
+                "io_type": io_type,
+                **runs[0],
+                **result,
+                "repeat": args.repeat,
+            }
+            records.append(record)
+
+            prev = last.get((workload.name, io_type))
+            change = (
+                f"{record['wall_secs'] / prev['wall_secs'] - 1:+.1%}" if prev else ""
+            )
+            print(
+                f"{workload.name:<16}{io_type:<6}{record['wall_secs']:>9.3f}"
+                + f"{record['cpu_secs']:>9.3f}{record['bytes_sent']:>9}"
+                + f"{record['bytes_received']:>9}"
+                + f"{record['timesteps_per_sec']:>10.0f}{change:>9}",
+                flush=True,
+            )
+
+    with open(args.history, "a") as f:
+        for record in records:
+            f.write(dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
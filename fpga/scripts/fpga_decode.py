@@ -0,0 +1,116 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import argparse
+import pathlib as pl
+
+import neuro
+import numpy as np
+
+from fpga._capture import RECORD_DATA_BYTES, CaptureKind, read_capture
+from fpga._processor import BAUDS_PER_BYTE, DispatchOpcode
+from fpga.decode import decode_packets, packet_histogram
+
+
+def _capture_streams(path: pl.Path) -> dict[str, tuple[bytes, float]]:
+    # bytes of each direction of a capture and the seconds it spans
+    records = read_capture(path)
+    valid = np.arange(RECORD_DATA_BYTES) < records["size"][:, None]
+    secs = (
+        float(records["time"][-1] - records["time"][0]) / 1e9 if len(records) else 0.0
+    )
+    streams = {}
+    for name, kind in [("tx", CaptureKind.TX), ("rx", CaptureKind.RX)]:
+        chunks = records["kind"] == kind
+        streams[name] = records["data"][chunks][valid[chunks]].tobytes(), secs
+    return streams
+
+
+def _report(
+    name: str, table: np.ndarray, num_bytes: int, secs: float | None, baud_rate: int
+) -> None:
+    num_pkts = int(table["pkt"][-1]) + 1 if len(table) else 0
+    histogram = packet_histogram(table)
+    print(f"{name}: {num_pkts} packets in {num_bytes} bytes")
+    for opcode, count in histogram.items():
+        print(f"  {opcode:<4}{count:>12}")
+    timesteps = int(table["value"][table["opcode"] == DispatchOpcode.RUN].sum())
+    if timesteps:
+        print(f"  {num_bytes / timesteps:.3g} bytes/timestep")
+    if secs:
+        used = num_bytes * BAUDS_PER_BYTE / secs
+        print(
+            f"  {num_bytes / secs:,.0f} bytes/s over {secs:.3f} s"
+            + f" ({used / baud_rate:.1%} of {baud_rate} baud)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="fpga-decode", description="Bulk Processor Packet Decoder"
+    )
+    parser.add_argument("network", type=pl.Path, help="JSON network filepath")
+    parser.add_argument("io_type", type=str, help="Processor I/O type (e.g. 'DISO')")
+    parser.add_argument(
+        "capture",
+        type=pl.Path,
+        help="Raw bytes of one direction, or a capture file of fpga.Capture with -c",
+    )
+    parser.add_argument(
+        "-c",
+        dest="is_capture",
+        action="store_true",
+        help="Decode both directions of a capture file written by fpga.Capture",
+    )
+    parser.add_argument(
+        "-x",
+        dest="tx",
+        action="store_true",
+        help="Raw bytes were sent to the target rather than received from it",
+    )
+    parser.add_argument(
+        "-s",
+        dest="secs",
+        type=float,
+        default=None,
+        help="Seconds the raw bytes span, to report link utilization",
+    )
+    parser.add_argument(
+        "-b",
+        dest="baud_rate",
+        type=int,
+        default=115200,
+        help="Baud rate of the link (defaults to 115200)",
+    )
+    parser.add_argument(
+        "-o",
+        dest="out",
+        type=pl.Path,
+        default=None,
+        help="NPZ file to save the decoded table to, one array per column",
+    )
+    args = parser.parse_args()
+
+    net = neuro.Network()
+    net.read_from_file(str(args.network))
+    if args.is_capture:
+        streams = _capture_streams(args.capture)
+    else:
+        streams = {"tx" if args.tx else "rx": (args.capture.read_bytes(), args.secs)}
+
+    columns = {}
+    for name, (data, secs) in streams.items():
+        table = decode_packets(net, args.io_type, data, name == "rx")
+        _report(name.upper(), table, len(data), secs, args.baud_rate)
+        prefix = f"{name}_" if args.is_capture else ""
+        for field in table.dtype.names:
+            columns[prefix + field] = table[field]
+    if args.out is not None:
+        np.savez(args.out, **columns)
+
+
+if __name__ == "__main__":
+    main()
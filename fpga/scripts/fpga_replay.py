@@ -0,0 +1,94 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import argparse
+import contextlib
+import pathlib as pl
+from json import dumps
+
+import neuro
+
+import fpga
+from fpga.emulator import Emulator, PtyServer
+from fpga.replay import read_commands, replay
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="fpga-replay", description="Processor Command File Replay"
+    )
+    parser.add_argument("network", type=pl.Path, help="JSON network filepath")
+    parser.add_argument("io_type", type=str, help="Processor I/O type (e.g. 'DISO')")
+    parser.add_argument(
+        "commands",
+        type=pl.Path,
+        nargs="+",
+        help="Command files of AS, RUN and CA lines, replayed in order",
+    )
+    parser.add_argument(
+        "-t",
+        dest="target",
+        type=str,
+        default=None,
+        help="Target device name (defaults to emulating one in-process)",
+    )
+    parser.add_argument(
+        "-d",
+        dest="dev",
+        type=pl.Path,
+        default=None,
+        help="cdev path for UART of the target (e.g. '/dev/ttyS1')",
+    )
+    parser.add_argument(
+        "-b",
+        dest="baud_rate",
+        type=int,
+        default=None,
+        help="Emulated baud rate (defaults to unlimited)",
+    )
+    parser.add_argument(
+        "-s",
+        dest="sim",
+        action="store_true",
+        help="Replay on fpga.SimProcessor instead of over UART",
+    )
+    parser.add_argument(
+        "-j", dest="json", action="store_true", help="Print the results as JSON"
+    )
+    args = parser.parse_args()
+    if args.target is not None and args.dev is None:
+        parser.error("a target requires a cdev path (-d)")
+
+    net = neuro.Network()
+    net.read_from_file(str(args.network))
+    steps = [step for path in args.commands for step in read_commands(path)]
+
+    with contextlib.ExitStack() as stack:
+        if args.sim:
+            proc = fpga.SimProcessor()
+        elif args.target is None:
+            server = stack.enter_context(
+                PtyServer(Emulator(net, args.io_type), args.baud_rate)
+            )
+            proc = fpga.Processor("emulator", server.path, args.io_type)
+        else:
+            proc = fpga.Processor(args.target, str(args.dev), args.io_type)
+        proc.load_network(net)
+        stats = replay(proc, steps)
+
+    if args.json:
+        print(dumps(stats.as_dict()))
+        return
+    print(f"Replayed {stats.timesteps} timesteps in {stats.secs:.3f} s")
+    print(f"{stats.timesteps_per_sec:,.0f} timesteps/s")
+    print(f"{stats.spikes_per_sec:,.0f} spikes/s ({stats.spikes} spikes)")
+    if stats.bytes_sent is not None:
+        print(f"{stats.bytes_sent} bytes sent, {stats.bytes_received} bytes received")
+    print(f"{sum(stats.fire_counts)} output fires: {stats.fire_counts}")
+
+
+if __name__ == "__main__":
+    main()
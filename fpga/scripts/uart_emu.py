@@ -0,0 +1,58 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import argparse
+import pathlib as pl
+from threading import Event
+
+import neuro
+
+from fpga.emulator import Emulator, PtyServer, SocketServer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="uart-emu", description="UART Processor Emulator"
+    )
+    parser.add_argument("network", type=pl.Path, help="JSON network filepath")
+    parser.add_argument("io_type", type=str, help="Processor I/O type (e.g. 'DISO')")
+    parser.add_argument(
+        "-b",
+        dest="baud_rate",
+        type=int,
+        default=None,
+        help="Emulated baud rate (defaults to unlimited)",
+    )
+    parser.add_argument(
+        "-p",
+        dest="port",
+        type=int,
+        default=None,
+        help="Serve over TCP on this local port instead of a pty",
+    )
+    args = parser.parse_args()
+
+    net = neuro.Network()
+    net.read_from_file(str(args.network))
+
+    device = Emulator(net, args.io_type)
+    if args.port is None:
+        server = PtyServer(device, args.baud_rate)
+        location = server.path
+    else:
+        server = SocketServer(device, args.baud_rate, port=args.port)
+        location = server.url
+    with server:
+        print(f"Emulating {args.io_type.upper()} processor on {location}")
+        print("Press Ctrl+C to stop.", flush=True)
+        try:
+            Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
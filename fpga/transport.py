@@ -0,0 +1,189 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import array
+import fcntl
+import os
+import select
+import socket
+import termios
+import tty
+from abc import ABC, abstractmethod
+from threading import Condition
+from time import monotonic
+from urllib.parse import urlsplit
+
+from periphery import Serial
+
+
+class Transport(ABC):
+    """Byte stream to a target with the parts of ``periphery.Serial`` used by
+    ``fpga.Processor``, which can itself be used wherever a transport is expected.
+
+    ``writev()`` writes several buffers in order as if they were one, which
+    transports override where they can do so without joining them. ``read()``
+    waits for ``length`` bytes until ``timeout`` seconds pass, or forever if it is
+    None, and ``poll()`` waits for any bytes in the same way. ``fd`` is the file
+    descriptor which ``fpga.AsyncProcessor`` waits on, if there is one.
+    """
+
+    fd = None
+    # rate of the UART behind the transport, if it is known
+    baudrate = None
+
+    @abstractmethod
+    def write(self, data: bytes) -> int:
+        pass
+
+    def writev(self, buffers: list[bytes]) -> int:
+        return self.write(b"".join(map(bytes, buffers)))
+
+    @abstractmethod
+    def read(self, length: int, timeout: float | None = None) -> bytes:
+        pass
+
+    @abstractmethod
+    def poll(self, timeout: float | None = None) -> bool:
+        pass
+
+    @abstractmethod
+    def input_waiting(self) -> int:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FdTransport(Transport):
+    """Transport over a file descriptor, which is switched to non-blocking mode."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        os.set_blocking(fd, False)
+
+    def write(self, data: bytes) -> int:
+        return self.writev([data])
+
+    def writev(self, buffers: list[bytes]) -> int:
+        """Write every buffer in order with as few system calls as possible."""
+        views = [memoryview(buffer).cast("B") for buffer in buffers]
+        total = sum(len(view) for view in views)
+        while views:
+            select.select([], [self.fd], [])
+            try:
+                written = os.writev(self.fd, views)
+            except BlockingIOError:
+                continue
+            while views and written >= len(views[0]):
+                written -= len(views.pop(0))
+            if views:
+                views[0] = views[0][written:]
+        return total
+
+    def read(self, length: int, timeout: float | None = None) -> bytes:
+        deadline = None if timeout is None else monotonic() + timeout
+        data = bytearray()
+        while len(data) < length:
+            remaining = None if deadline is None else max(0.0, deadline - monotonic())
+            if not select.select([self.fd], [], [], remaining)[0]:
+                break
+            try:
+                chunk = os.read(self.fd, length - len(data))
+            except BlockingIOError:
+                continue
+            if not chunk:
+                raise RuntimeError("Transport was closed by the target.")
+            data.extend(chunk)
+        return bytes(data)
+
+    def poll(self, timeout: float | None = None) -> bool:
+        return bool(select.select([self.fd], [], [], timeout)[0])
+
+    def input_waiting(self) -> int:
+        waiting = array.array("i", [0])
+        fcntl.ioctl(self.fd, termios.FIONREAD, waiting, True)
+        return waiting[0]
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class TermiosTransport(FdTransport):
+    """Raw 8N1 serial port opened and configured directly through termios."""
+
+    def __init__(self, path: str, baudrate: int):
+        try:
+            speed = getattr(termios, f"B{baudrate}")
+        except AttributeError:
+            raise ValueError(f"Unsupported baud rate: {baudrate}")
+        fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(fd)
+        attrs = termios.tcgetattr(fd)
+        attrs[2] = (attrs[2] & ~(termios.CSTOPB | termios.CRTSCTS)) | termios.CLOCAL
+        attrs[4] = attrs[5] = speed
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+        super().__init__(fd)
+        self.baudrate = baudrate
+
+    def flush(self) -> None:
+        termios.tcdrain(self.fd)
+
+
+class SocketTransport(FdTransport):
+    """Transport over a TCP connection, such as to ``fpga.emulator.SocketServer``."""
+
+    def __init__(self, host: str, port: int, baudrate: int | None = None):
+        self._sock = socket.create_connection((host, port))
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().__init__(self._sock.fileno())
+        self.baudrate = baudrate
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+class LoopbackTransport(Transport):
+    """In-memory transport to a byte-level device such as ``fpga.emulator.Emulator``.
+
+    Bytes are handed to the device as they are written, with no operating system
+    in between, so the host can be exercised apart from any UART. There is no file
+    descriptor, so it cannot be used by ``fpga.AsyncProcessor``.
+    """
+
+    def __init__(self, device):
+        self._device = device
+        self._cond = Condition()
+
+    def write(self, data: bytes) -> int:
+        with self._cond:
+            self._device.write(bytes(data))
+            self._cond.notify_all()
+        return len(data)
+
+    def read(self, length: int, timeout: float | None = None) -> bytes:
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._device.output_waiting() >= length, timeout
+            )
+            return self._device.read(length)
+
+    def poll(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(self._device.output_waiting, timeout) > 0
+
+    def input_waiting(self) -> int:
+        with self._cond:
+            return self._device.output_waiting()
+
+
+def open_transport(path: str, baudrate: int) -> Serial | Transport:
+    """Open ``tcp://host:port`` as a socket or anything else as a serial cdev."""
+    url = urlsplit(path)
+    if url.scheme == "tcp":
+        return SocketTransport(url.hostname, url.port)
+    return Serial(path, baudrate)
@@ -0,0 +1,181 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import ctypes
+import pathlib as pl
+import shutil
+import subprocess
+from importlib import resources
+
+import neuro
+
+import fpga
+from fpga import cpp, rtl
+from fpga._math import width_bits_to_bytes
+from fpga.emulator import _io_types, packet_widths
+from fpga.network import HASH_LEN, build_network_sv, hash_network, proc_name
+
+LIB_NAME = "libaxis_processor.so"
+
+
+def build_verilated_lib(net: neuro.Network, io_type: str = "DISO") -> pl.Path:
+    """Compile ``axis_processor`` for ``net`` into a shared library with Verilator.
+
+    Libraries are cached by network hash and I/O type and only rebuilt when a source
+    is newer than the library.
+    """
+    inp_type, out_type = _io_types(io_type)
+    proc = proc_name(net)
+    obj_path = (
+        fpga.sims_build_path
+        / "verilated"
+        / io_type.upper()
+        / hash_network(net, HASH_LEN)
+    )
+    lib_path = obj_path / LIB_NAME
+
+    rtl_path = pl.Path(resources.files(rtl))
+    sources = [
+        rtl_path / f"{module}.sv" for module in [f"{proc}_neuron", f"{proc}_synapse"]
+    ]
+    sources.append(build_network_sv(net))
+    sources.extend(
+        rtl_path / f"{module}.sv"
+        for module in [
+            "io_configs",
+            f"{inp_type.name.lower()}_source",
+            f"{out_type.name.lower()}_sink",
+            "network_arstn",
+            "axis_processor",
+        ]
+    )
+    sources.append(pl.Path(resources.files(cpp)) / "axis_processor_lib.cpp")
+    if lib_path.exists() and lib_path.stat().st_mtime > max(
+        src.stat().st_mtime for src in sources
+    ):
+        return lib_path
+
+    verilator = shutil.which("verilator")
+    if verilator is None:
+        raise RuntimeError("Verilator is required to build a verilated processor.")
+
+    obj_path.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [
+            verilator,
+            "--cc",
+            "--exe",
+            "--build",
+            "-j",
+            "0",
+            "-O3",
+            "--x-assign",
+            "fast",
+            "--x-initial",
+            "fast",
+            "-Wno-fatal",
+            "-Wno-lint",
+            "-Wno-style",
+            "--top-module",
+            "axis_processor",
+            "--Mdir",
+            str(obj_path),
+            f"-I{rtl_path}",
+            "-CFLAGS",
+            "-fPIC",
+            "-LDFLAGS",
+            "-shared",
+            "-o",
+            LIB_NAME,
+        ]
+        + [str(src) for src in sources],
+        check=True,
+        capture_output=True,
+    )
+    return lib_path
+
+
+class VerilatedDevice:
+    """Cycle-accurate ``axis_processor`` for a network, compiled with Verilator.
+
+    It exchanges the same bytes as ``fpga.emulator.Emulator`` and can be served
+    with ``fpga.emulator.PtyServer`` or wrapped in
+    ``fpga.transport.LoopbackTransport`` in the same way, but every packet is
+    clocked through the real RTL. Written packets are clocked in back-to-back and
+    the processor is then clocked until idle, so all resulting output can be read
+    as soon as ``write()`` returns.
+    """
+
+    def __init__(self, net: neuro.Network, io_type: str = "DISO"):
+        self._lib = ctypes.CDLL(str(build_verilated_lib(net, io_type)))
+        self._lib.proc_new.restype = ctypes.c_void_p
+        self._lib.proc_new.argtypes = [ctypes.c_size_t, ctypes.c_size_t]
+        self._lib.proc_free.argtypes = [ctypes.c_void_p]
+        self._lib.proc_reset.argtypes = [ctypes.c_void_p]
+        self._lib.proc_write.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_char_p,
+            ctypes.c_size_t,
+            ctypes.c_uint64,
+        ]
+        self._lib.proc_output_waiting.restype = ctypes.c_size_t
+        self._lib.proc_output_waiting.argtypes = [ctypes.c_void_p]
+        self._lib.proc_read.restype = ctypes.c_size_t
+        self._lib.proc_read.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_char_p,
+            ctypes.c_size_t,
+        ]
+        self._lib.proc_cycles.restype = ctypes.c_uint64
+        self._lib.proc_cycles.argtypes = [ctypes.c_void_p]
+
+        inp_pkt_width, out_pkt_width = packet_widths(net, io_type)
+        self._inp_pkt_bytes = width_bits_to_bytes(inp_pkt_width)
+        self._handle = self._lib.proc_new(
+            self._inp_pkt_bytes, width_bits_to_bytes(out_pkt_width)
+        )
+        # the dispatch sink may skip over every output before its next packet
+        self._settle = net.num_outputs() + 8
+        self.reset()
+
+    def __del__(self):
+        if getattr(self, "_handle", None):
+            self._lib.proc_free(self._handle)
+            self._handle = None
+
+    def reset(self) -> None:
+        """Assert the global reset of the processor."""
+        self._rx = bytearray()
+        self._lib.proc_reset(self._handle)
+
+    @property
+    def cycles(self) -> int:
+        """Clock cycles elapsed since the last reset."""
+        return self._lib.proc_cycles(self._handle)
+
+    def write(self, data: bytes) -> None:
+        """Clock in every completed packet received from the host."""
+        self._rx.extend(data)
+        num_pkts = len(self._rx) // self._inp_pkt_bytes
+        if not num_pkts:
+            return
+        self._lib.proc_write(
+            self._handle,
+            bytes(self._rx[: num_pkts * self._inp_pkt_bytes]),
+            num_pkts,
+            self._settle,
+        )
+        del self._rx[: num_pkts * self._inp_pkt_bytes]
+
+    def read(self, size: int = -1) -> bytes:
+        """Take up to ``size`` bytes (or all if negative) bound for the host."""
+        if size < 0:
+            size = self.output_waiting()
+        buf = ctypes.create_string_buffer(size)
+        size = self._lib.proc_read(self._handle, buf, size)
+        return buf.raw[:size]
+
+    def output_waiting(self) -> int:
+        return self._lib.proc_output_waiting(self._handle)
@@ -0,0 +1,92 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import pathlib as pl
+
+import neuro
+import numpy as np
+import pytest
+
+import fpga
+from fpga._processor import DispatchOpcode, InpConfig, IoType
+from fpga.decode import decode_packets, packet_histogram
+from fpga.emulator import Emulator
+from fpga.network import NetworkDescriptor
+
+proj_path = pl.Path(__file__).parent.parent
+net = neuro.Network()
+net.read_from_file(str(proj_path / "dbscan_example" / "dbscan-20-4-5.txt"))
+
+
+def _random_spikes() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    num_inputs = NetworkDescriptor(net).num_inputs
+    times = np.sort(rng.integers(0, 50, 200))
+    idxs = rng.integers(0, num_inputs, 200)
+    # keep one spike per input and timestep, as the encoder would
+    _, unique = np.unique(times * num_inputs + idxs, return_index=True)
+    times, idxs = times[unique], idxs[unique]
+    return times, idxs, np.ones(len(times), dtype=np.int64)
+
+
+def _ran_before(table: np.ndarray) -> np.ndarray:
+    # timesteps run by the events before each one
+    runs = np.where(table["opcode"] == DispatchOpcode.RUN, table["value"], 0)
+    return np.cumsum(runs) - runs
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_decode_packets(io_type: str) -> None:
+    desc = NetworkDescriptor(net)
+    inp = InpConfig(IoType.DISPATCH if io_type[0] == "D" else IoType.STREAM, desc)
+    times, idxs, vals = _random_spikes()
+    pkts, _ = inp.encode(times, idxs, vals, 60, 15, sync=True, clear=True, begin=0)
+
+    table = decode_packets(net, io_type, pkts.tobytes() + b"\x00", output=False)
+    spks = table[table["opcode"] == DispatchOpcode.SPK]
+    assert spks["timestep"].tolist() == times.tolist()
+    assert spks["index"].tolist() == idxs.tolist()
+    assert spks["value"].tolist() == vals.tolist()
+    histogram = packet_histogram(table)
+    assert histogram["SPK"] == len(times)
+    assert histogram["SNC"] == histogram["CLR"] == 1
+    assert table["value"][table["opcode"] == DispatchOpcode.RUN].sum() == 60
+    snc = table["opcode"] == DispatchOpcode.SNC
+    assert table["timestep"][snc].tolist() == _ran_before(table)[snc].tolist() == [60]
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_decode_output_packets(io_type: str) -> None:
+    desc = NetworkDescriptor(net)
+    inp = InpConfig(IoType.DISPATCH if io_type[0] == "D" else IoType.STREAM, desc)
+    times, idxs, vals = _random_spikes()
+    first, _ = inp.encode(times, idxs, vals, 60, 15, sync=True, clear=True, begin=0)
+    none = np.empty(0, dtype=np.int64)
+    second, _ = inp.encode(none, none, none, 70, 15, sync=True, begin=60)
+    emulator = Emulator(net, io_type)
+    emulator.write(first.tobytes() + second.tobytes())
+
+    sim = fpga.SimProcessor()
+    sim.load_network(net)
+    sim.apply_spike_arrays(idxs, times, vals.astype(np.float64))
+    sim.run(60)
+    fires = [(int(t), i) for i, ts in enumerate(sim.output_vectors()) for t in ts]
+    sim.run(10)
+    fires += [(int(t) + 60, i) for i, ts in enumerate(sim.output_vectors()) for t in ts]
+
+    table = decode_packets(net, io_type, emulator.read())
+    spks = table[table["opcode"] == DispatchOpcode.SPK]
+    assert sorted(zip(spks["timestep"].tolist(), spks["index"].tolist())) == sorted(
+        fires
+    )
+    clrs = table[table["opcode"] == DispatchOpcode.CLR]
+    assert clrs["timestep"].tolist() == [0]
+    # SNCs come after the timesteps they end, except where they are reported
+    # with a run still held (SIDO) or held until the next packet (the last of DISO)
+    snc = table["opcode"] == DispatchOpcode.SNC
+    expected = {"DIDO": [60, 70], "DISO": [60], "SIDO": [59, 69], "SISO": [60, 70]}
+    assert table["timestep"][snc].tolist() == expected[io_type]
+    assert _ran_before(table)[snc].tolist() == expected[io_type]
@@ -0,0 +1,392 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import asyncio
+import contextlib
+import pathlib as pl
+
+import neuro
+import numpy as np
+import pytest
+
+import fpga
+from fpga.emulator import Emulator, PtyServer, SocketServer
+from fpga.network import SPIKE_DTYPE, charge_width, spike_value_factor
+from fpga.transport import LoopbackTransport, TermiosTransport, Transport
+
+proj_path = pl.Path(__file__).parent.parent
+net = neuro.Network()
+net.read_from_file(str(proj_path / "networks" / "simple.txt"))
+
+_delay_idx = net.get_edge_property("Delay").index
+_weight_idx = net.get_edge_property("Weight").index
+_thresh_idx = net.get_node_property("Threshold").index
+
+delay = int(net.get_edge(0, 1).values[_delay_idx])
+weight = int(net.get_edge(0, 1).values[_weight_idx])
+threshold_1 = int(net.get_node(1).values[_thresh_idx])
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_emulated_processor(io_type: str) -> None:
+    # every input spike fires neuron 0, each adding weight to neuron 1 after delay
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+
+    with PtyServer(Emulator(net, io_type)) as server:
+        proc = fpga.Processor("emulator", server.path, io_type)
+        proc.load_network(net)
+        for _ in range(2):
+            proc.apply_spikes([neuro.Spike(0, i, 1.0) for i in range(num_spikes)])
+            proc.run(expected_fire + 2)
+            assert proc.output_vector(0) == [float(expected_fire)]
+            raster = proc.output_raster()
+            assert raster.shape == (expected_fire + 2, 1)
+            assert np.flatnonzero(raster[:, 0]).tolist() == [expected_fire]
+        proc.clear_activity()
+        proc.apply_spikes([neuro.Spike(0, 0, 1.0)])
+        proc.run(expected_fire + 2)
+        assert proc.output_count(0) == 0
+        assert not proc.output_raster().any()
+
+
+def test_rejected_spike_leaves_queue() -> None:
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+    too_big = (1 << (charge_width(net) - 1)) / spike_value_factor(net)
+
+    stats = fpga.Stats()
+    proc = fpga.Processor(
+        "emulator", LoopbackTransport(Emulator(net, "DIDO")), "DIDO", stats=stats
+    )
+    proc.load_network(net)
+    stats.clear()
+    with pytest.raises(ValueError):
+        proc.apply_spike(neuro.Spike(0, 5, too_big))
+    proc.apply_spikes([neuro.Spike(0, i, 1.0) for i in range(num_spikes)])
+    proc.run(expected_fire + 2)
+    assert proc.output_vector(0) == [float(expected_fire)]
+    assert stats.runs == 1
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_emulated_processor_spike_arrays(io_type: str) -> None:
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+    spikes = np.zeros(num_spikes, dtype=SPIKE_DTYPE)
+    spikes["time"] = np.arange(num_spikes)
+    spikes["value"] = 1.0
+
+    with PtyServer(Emulator(net, io_type)) as server:
+        proc = fpga.Processor("emulator", server.path, io_type)
+        proc.load_network(net)
+        # the spike applied last to an input in a timestep wins
+        proc.apply_spike_arrays(0, np.arange(num_spikes), 1.0)
+        proc.apply_spike(neuro.Spike(0, num_spikes - 1, 0.0))
+        proc.run(expected_fire + 2)
+        assert proc.output_count(0) == 0
+        proc.clear_activity()
+        proc.apply_spike(neuro.Spike(0, num_spikes - 1, 0.0))
+        proc.apply_spike_arrays(spikes)
+        proc.run(expected_fire + 2)
+        assert proc.output_vector(0) == [float(expected_fire)]
+        with pytest.raises(ValueError):
+            proc.apply_spike_arrays([1], [0], [1.0])
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_emulated_processor_small_buffers(io_type: str) -> None:
+    # buffers this small only allow one run in flight, forcing every credit path
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+    period = expected_fire + 4
+
+    with PtyServer(Emulator(net, io_type)) as server:
+        proc = fpga.Processor("emulator", server.path, io_type)
+        proc._target_config["parameters"]["uart"].update(buffer_rx=1, buffer_tx=1)
+        proc.load_network(net)
+        for start in range(0, 4 * period, period):
+            proc.apply_spikes(
+                [neuro.Spike(0, start + i, 1.0) for i in range(num_spikes)]
+            )
+        proc.run(4 * period)
+        assert proc.output_vector(0) == [
+            float(start + expected_fire) for start in range(0, 4 * period, period)
+        ]
+
+
+@pytest.mark.parametrize("transport", ["termios", "tcp", "loopback"])
+@pytest.mark.parametrize("io_type", ["DIDO", "SISO"])
+def test_transports(transport: str, io_type: str) -> None:
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+
+    with contextlib.ExitStack() as stack:
+        match transport:
+            case "termios":
+                server = stack.enter_context(PtyServer(Emulator(net, io_type)))
+                interface = TermiosTransport(server.path, 115200)
+            case "tcp":
+                server = stack.enter_context(SocketServer(Emulator(net, io_type)))
+                interface = server.url
+            case "loopback":
+                interface = LoopbackTransport(Emulator(net, io_type))
+        proc = fpga.Processor("emulator", interface, io_type)
+        stack.callback(proc._interface.close)
+        proc.load_network(net)
+        proc.apply_spikes([neuro.Spike(0, i, 1.0) for i in range(num_spikes)])
+        proc.run(expected_fire + 2)
+        assert proc.output_vector(0) == [float(expected_fire)]
+
+
+class _RecordingTransport(LoopbackTransport):
+    # records how many buffers each call to writev() was given
+    def __init__(self, device: Emulator):
+        super().__init__(device)
+        self.writes = []
+
+    def writev(self, buffers: list[bytes]) -> int:
+        self.writes.append(len(buffers))
+        return super().writev(buffers)
+
+
+def test_batched_writes() -> None:
+    with pytest.raises(TypeError):
+        Transport()
+
+    interface = _RecordingTransport(Emulator(net, "DIDO"))
+    proc = fpga.Processor("emulator", interface, "DIDO")
+    proc.load_network(net)
+    num_steps = 20 * proc._max_pkts_ahead
+    proc.apply_spikes([neuro.Spike(0, i, 1.0) for i in range(num_steps)])
+    interface.writes.clear()
+    proc.run(num_steps)
+    # every chunk but the last is written along with the SNC which credits it
+    assert len(interface.writes) > 1
+    assert interface.writes[:-1] == [2] * (len(interface.writes) - 1)
+    assert interface.writes[-1] == 1
+
+
+class _UnacknowledgingEmulator(Emulator):
+    # clears the network without its sink ever acknowledging the CLR
+    def _sink(
+        self, fires: np.ndarray | None, sync: bool = False, clear: bool = False
+    ) -> None:
+        super()._sink(fires, sync)
+
+
+# a DIDO target answers the CLR within clear_activity() rather than the next run
+@pytest.mark.parametrize("io_type", ["DISO", "SIDO", "SISO"])
+def test_clear_activity_acknowledged(io_type: str) -> None:
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+
+    spikes = [neuro.Spike(0, i, 1.0) for i in range(num_spikes)]
+
+    with PtyServer(_UnacknowledgingEmulator(net, io_type)) as server:
+        proc = fpga.Processor("emulator", server.path, io_type)
+        proc.load_network(net)
+        proc.apply_spikes(spikes)
+        with pytest.raises(RuntimeError, match="acknowledge CLR"):
+            proc.run(expected_fire + 2)
+
+    async def run_async(path: str) -> None:
+        proc = fpga.AsyncProcessor("emulator", path, io_type)
+        await proc.load_network(net)
+        await proc.apply_spikes(spikes)
+        await proc.run(expected_fire + 2)
+
+    with PtyServer(_UnacknowledgingEmulator(net, io_type)) as server:
+        with pytest.raises(RuntimeError, match="acknowledge CLR"):
+            asyncio.run(run_async(server.path))
+
+
+def test_async_processors() -> None:
+    # one event loop drives a board of each I/O type at once
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+    io_types = ["DIDO", "DISO", "SIDO", "SISO"]
+
+    async def drive(proc: fpga.AsyncProcessor) -> list[tuple[int, float]]:
+        await proc.load_network(net)
+        fires = []
+
+        async def listen() -> None:
+            async for fire in proc.outputs():
+                fires.append(fire)
+
+        listener = asyncio.create_task(listen())
+        await proc.apply_spikes([neuro.Spike(0, i, 1.0) for i in range(num_spikes)])
+        await proc.run(expected_fire + 2)
+        await asyncio.sleep(0)
+        listener.cancel()
+        assert proc.output_vector(0) == [float(expected_fire)]
+        return fires
+
+    async def drive_all() -> list[list[tuple[int, float]]]:
+        return await asyncio.gather(
+            *(
+                drive(fpga.AsyncProcessor("emulator", server.path, io_type))
+                for server, io_type in zip(servers, io_types)
+            )
+        )
+
+    servers = [PtyServer(Emulator(net, io_type)) for io_type in io_types]
+    with contextlib.ExitStack() as stack:
+        for server in servers:
+            stack.enter_context(server)
+        for fires in asyncio.run(drive_all()):
+            assert fires == [(0, float(expected_fire))]
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_async_long_run(io_type: str) -> None:
+    # a spike every step keeps the port busy, which must not hold up the loop
+    num_steps = 1 << 12
+    ids = np.zeros(num_steps, dtype=np.int64)
+
+    with PtyServer(Emulator(net, io_type)) as server:
+        proc = fpga.Processor("emulator", server.path, io_type)
+        proc.load_network(net)
+        proc.apply_spike_arrays(ids, np.arange(num_steps), 1.0)
+        proc.run(num_steps + delay)
+        expected = proc.output_vectors()
+
+    async def drive(path: str) -> tuple[list[list[float]], int]:
+        proc = fpga.AsyncProcessor("emulator", path, io_type)
+        await proc.load_network(net)
+        num_beats = 0
+
+        async def beat() -> None:
+            nonlocal num_beats
+            while True:
+                num_beats += 1
+                await asyncio.sleep(0)
+
+        beater = asyncio.create_task(beat())
+        await proc.apply_spike_arrays(ids, np.arange(num_steps), 1.0)
+        await proc.run(num_steps + delay)
+        beater.cancel()
+        return proc.output_vectors(), num_beats
+
+    with PtyServer(Emulator(net, io_type)) as server:
+        vectors, num_beats = asyncio.run(drive(server.path))
+    assert vectors == expected
+    assert num_beats > num_steps
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_emulated_processor_episodes(io_type: str) -> None:
+    # the last spike only fires neuron 1 if charge carries over between episodes
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+    fire = [neuro.Spike(0, i, 1.0) for i in range(num_spikes)]
+
+    with PtyServer(Emulator(net, io_type)) as server:
+        proc = fpga.Processor("emulator", server.path, io_type)
+        proc.load_network(net)
+        outputs = proc.run_episodes([fire, fire[:-1], fire[-1:]], expected_fire + 2)
+        assert outputs == [[[float(expected_fire)]], [[]], [[]]]
+        assert proc.output_vector(0) == []
+        assert proc.output_raster().shape == (expected_fire + 2, 1)
+        assert not proc.output_raster().any()
+
+
+def test_processor_pool() -> None:
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+    fire = [neuro.Spike(0, i, 1.0) for i in range(num_spikes)]
+    episodes = [fire if i % 3 else fire[:-1] for i in range(10)]
+
+    servers = [PtyServer(Emulator(net, "DISO")) for _ in range(3)]
+    with contextlib.ExitStack() as stack:
+        for server in servers:
+            stack.enter_context(server)
+        pool = fpga.ProcessorPool("emulator", [server.path for server in servers])
+        pool.load_network(net)
+        # single-episode batches leave plenty to steal
+        outputs = pool.run_episodes(episodes, expected_fire + 2, batch_size=1)
+    assert outputs == [
+        [[float(expected_fire)]] if i % 3 else [[]] for i in range(len(episodes))
+    ]
+
+
+def test_processor_pool_limits() -> None:
+    with pytest.raises(ValueError, match="cannot share stats"):
+        fpga.ProcessorPool("emulator", [None, None], stats=fpga.Stats())
+
+    servers = [PtyServer(Emulator(net, "DIDO")) for _ in range(2)]
+    with contextlib.ExitStack() as stack:
+        for server in servers:
+            stack.enter_context(server)
+        pool = fpga.ProcessorPool("basys3", [server.path for server in servers])
+        with pytest.raises(RuntimeError, match="more than one board"):
+            pool.load_network(net)
+
+
+def test_processor_stats(tmp_path: pl.Path) -> None:
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+    jsonl = fpga.JsonlExporter(tmp_path / "runs.jsonl")
+    stats = fpga.Stats(
+        [jsonl, fpga.PrometheusExporter(tmp_path / "fpga.prom", {"board": "0"})]
+    )
+
+    with PtyServer(Emulator(net, "DIDO")) as server, jsonl:
+        proc = fpga.Processor("emulator", server.path, "DIDO", stats=stats)
+        proc.load_network(net)
+        stats.clear()
+        bytes_sent = proc.bytes_sent
+        for _ in range(2):
+            proc.apply_spikes([neuro.Spike(0, i, 1.0) for i in range(num_spikes)])
+            proc.run(expected_fire + 2)
+            # every line is readable as soon as its run ends
+            num_lines = len((tmp_path / "runs.jsonl").read_text().splitlines())
+            assert num_lines == stats.runs
+    assert stats.runs == 2
+    assert stats.timesteps == 2 * (expected_fire + 2)
+    assert stats.bytes_sent == proc.bytes_sent - bytes_sent
+    assert stats.pkts_sent == stats.bytes_sent // 2
+    assert stats.last_run.pkts_received > 0
+    assert stats.last_run.runs == 1
+    assert len((tmp_path / "runs.jsonl").read_text().splitlines()) == 2
+    prom = (tmp_path / "fpga.prom").read_text()
+    assert f'fpga_bytes_sent_total{{board="0"}} {stats.bytes_sent}' in prom
+    assert fpga.Processor("emulator").stats is None
+
+
+def test_retention_spill(tmp_path: pl.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # only the last run stays in memory but every fire can still be found
+    monkeypatch.setattr("fpga._processor.MIN_SEGMENT_FIRES", 1)
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+    period = expected_fire + 2
+
+    with PtyServer(Emulator(net, "DIDO")) as server:
+        proc = fpga.Processor(
+            "emulator",
+            server.path,
+            "DIDO",
+            retention=fpga.Retention(runs=1, spill=tmp_path),
+        )
+        proc.load_network(net)
+        views = []
+        for _ in range(4):
+            proc.apply_spikes([neuro.Spike(0, i, 1.0) for i in range(num_spikes)])
+            proc.run(period)
+            assert proc.output_vector(0) == [float(expected_fire)]
+            views.append(proc.output_array(0))
+        expected = [run * period + expected_fire for run in range(4)]
+        assert proc.output_history(0).tolist() == expected
+        assert proc.output_history(0, period, 3 * period).tolist() == expected[1:3]
+        assert proc._out.queue.lens.sum() < len(expected)
+        assert list(tmp_path.glob("*.npz"))
+        # letting go of fires leaves the views of earlier runs as they were
+        assert [view.tolist() for view in views] == [[time] for time in expected]
+
+        proc.clear_activity()
+        assert proc.output_history(0).tolist() == []
+        assert proc.output_history(0, epoch=proc.epoch - 1).tolist() == expected
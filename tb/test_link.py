@@ -0,0 +1,77 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import pathlib as pl
+
+import neuro
+import numpy as np
+import pytest
+
+import fpga
+from fpga.emulator import Emulator, PtyServer
+from fpga.link import predict_links, recommend_io_type
+from fpga.network import SPIKE_DTYPE
+
+proj_path = pl.Path(__file__).parent.parent
+net = neuro.Network()
+net.read_from_file(str(proj_path / "dbscan_example" / "dbscan-20-4-5.txt"))
+
+time = 1000
+rng = np.random.default_rng(0)
+spikes = np.zeros(400, dtype=SPIKE_DTYPE)
+spikes["id"] = [net.get_input(i) for i in rng.integers(0, net.num_inputs(), 400)]
+spikes["time"] = rng.integers(0, time, 400)
+spikes["value"] = 1.0
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_link_prediction(io_type: str) -> None:
+    with PtyServer(Emulator(net, io_type)) as server:
+        proc = fpga.Processor("emulator", server.path, io_type)
+        proc.load_network(net)
+        sent, received = proc.bytes_sent, proc.bytes_received
+        proc.apply_spike_arrays(spikes)
+        proc.run(time)
+        sent, received = proc.bytes_sent - sent, proc.bytes_received - received
+        output_rate = sum(proc.output_counts()) / time / net.num_outputs()
+
+    (pred,) = predict_links(
+        net,
+        "emulator",
+        spikes=spikes,
+        time=time,
+        run_time=time,
+        output_rate=output_rate,
+        io_types=[io_type],
+    )
+    # a dispatch sink can take extra SNCs to flush it partway through a run
+    assert sent == pytest.approx(pred.tx_bytes_per_step * time, rel=0.05)
+    assert received == pytest.approx(pred.rx_bytes_per_step * time, rel=0.2)
+
+
+def test_auto_io_type() -> None:
+    # sparse traffic is cheapest as dispatch and dense traffic as stream
+    assert recommend_io_type(net, "emulator", input_rate=0.01, output_rate=0.01) == (
+        "DIDO"
+    )
+    assert recommend_io_type(net, "emulator", input_rate=0.5, output_rate=0.5) == (
+        "SISO"
+    )
+
+    with PtyServer(Emulator(net, "DIDO")) as server:
+        proc = fpga.Processor("emulator", server.path, "auto")
+        with pytest.raises(ValueError):
+            proc.load_network(net, False)
+        proc.load_network(net)
+        assert proc.io_type == "DIDO"
+
+    workload = {"input_rate": 0.5, "output_rate": 0.5}
+    with PtyServer(Emulator(net, "SISO")) as server:
+        proc = fpga.Processor("emulator", server.path, "auto", workload=workload)
+        proc.load_network(net)
+        assert proc.io_type == "SISO"
+    with pytest.raises(ValueError):
+        fpga.Processor("emulator", None, "DIDO", workload=workload)
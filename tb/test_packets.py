@@ -0,0 +1,47 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import bitstruct as bs
+import numpy as np
+
+from fpga._packets import PacketLayout
+
+
+def test_pack_matches_bitstruct() -> None:
+    rng = np.random.default_rng(0)
+    fmt = bs.compile("b1b1s5s5s5", ["SNC", "CLR", 0, 1, 2])
+    layout = PacketLayout(fmt)
+    snc = rng.integers(0, 2, 64).astype(bool)
+    vals = rng.integers(-16, 16, (64, 3))
+    pkts = layout.pack(64, {"SNC": snc, "CLR": True, 0: vals})
+    for i in range(64):
+        expected = {"SNC": bool(snc[i]), "CLR": True}
+        expected.update({j: int(vals[i, j]) for j in range(3)})
+        assert pkts[i].tobytes() == fmt.pack(expected)[::-1]
+
+
+def test_unpack_inverts_pack() -> None:
+    rng = np.random.default_rng(1)
+    fmt = bs.compile("u2u6s7", ["opcode", "idx", "val"])
+    layout = PacketLayout(fmt)
+    fields = {
+        "opcode": rng.integers(0, 4, 64),
+        "idx": rng.integers(0, 64, 64),
+        "val": rng.integers(-64, 64, 64),
+    }
+    unpacked = layout.unpack(layout.pack(64, fields))
+    for name, vals in fields.items():
+        assert np.array_equal(unpacked[name], vals)
+
+
+def test_unpack_fields_of_wide_packets() -> None:
+    rng = np.random.default_rng(2)
+    fmt = bs.compile("b1b1" + "s9" * 12, ["SNC", "CLR", *range(12)])
+    layout = PacketLayout(fmt)
+    vals = rng.integers(-256, 256, (64, 12))
+    pkts = layout.pack(64, {"CLR": True, 0: vals})
+    assert np.array_equal(layout.unpack_fields(pkts, 0, 12), vals)
+    assert layout.unpack_fields(pkts, "CLR").ravel().tolist() == [1] * 64
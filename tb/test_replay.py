@@ -0,0 +1,69 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import pathlib as pl
+
+import neuro
+import pytest
+
+import fpga
+from fpga.emulator import Emulator, PtyServer
+from fpga.replay import parse_commands, read_commands, replay, replay_capture
+
+proj_path = pl.Path(__file__).parent.parent
+net = neuro.Network()
+net.read_from_file(str(proj_path / "networks" / "simple.txt"))
+
+commands = b"AS 0 0 1\nAS 0 1 1\nAS 0 2 1\nRUN 6\nCA\nAS 0 0 1\nRUN 6\n"
+
+
+def test_parse_commands() -> None:
+    steps = parse_commands(commands)
+    assert [command for command, _ in steps] == ["AS", "RUN", "CA", "AS", "RUN"]
+    assert steps[0][1]["time"].tolist() == [0.0, 1.0, 2.0]
+    assert steps[1][1] == 6
+    with pytest.raises(ValueError):
+        parse_commands(b"AS 0 0\nRUN 6\n")
+    with pytest.raises(ValueError):
+        parse_commands(b"OC\n")
+
+    steps = read_commands(proj_path / "dbscan_example" / "input_112.txt")
+    assert sum(len(spikes) for command, spikes in steps if command == "AS") == 10023
+
+
+def test_replay() -> None:
+    sim = fpga.SimProcessor()
+    sim.load_network(net)
+    expected = replay(sim, parse_commands(commands))
+    assert expected.timesteps == 12 and expected.spikes == 4
+    assert expected.bytes_sent is None
+
+    with PtyServer(Emulator(net, "DIDO")) as server:
+        proc = fpga.Processor("emulator", server.path, "DIDO")
+        proc.load_network(net)
+        stats = replay(proc, parse_commands(commands))
+    assert stats.fire_counts == expected.fire_counts
+    assert stats.bytes_sent > 0 and stats.bytes_received > 0
+
+
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_replay_capture(io_type: str, tmp_path: pl.Path) -> None:
+    path = tmp_path / "session.cap"
+    with PtyServer(Emulator(net, io_type)) as server, fpga.Capture(path) as capture:
+        proc = fpga.Processor("emulator", server.path, io_type, capture=capture)
+        proc.load_network(net)
+        stats = replay(proc, parse_commands(commands))
+        episodes = proc.run_episodes([[neuro.Spike(0, i, 1.0) for i in range(3)]], 6)
+    fires = [
+        count + len(episodes[0][out_idx])
+        for out_idx, count in enumerate(stats.fire_counts)
+    ]
+
+    for emulate in [False, True]:
+        replayed = replay_capture(net, path, emulate)
+        assert replayed.fire_counts == fires
+        assert replayed.timesteps == stats.timesteps + 6
+        assert replayed.bytes_sent == proc.bytes_sent
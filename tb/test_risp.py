@@ -0,0 +1,89 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import pathlib as pl
+
+import neuro
+import numpy as np
+import pytest
+
+from fpga import SimProcessor
+from fpga.network import charge_width, spike_value_factor
+from fpga.risp import simulate_episodes
+
+proj_path = pl.Path(__file__).parent.parent
+net = neuro.Network()
+net.read_from_file(str(proj_path / "networks" / "simple.txt"))
+
+_delay_idx = net.get_edge_property("Delay").index
+_weight_idx = net.get_edge_property("Weight").index
+_thresh_idx = net.get_node_property("Threshold").index
+
+delay = int(net.get_edge(0, 1).values[_delay_idx])
+weight = int(net.get_edge(0, 1).values[_weight_idx])
+threshold_1 = int(net.get_node(1).values[_thresh_idx])
+num_spikes = -(-threshold_1 // weight)
+
+
+def test_batched_episodes() -> None:
+    timesteps = num_spikes + delay + 8
+    # episode i starts its input train i timesteps late, the last has no input
+    episodes = [
+        [neuro.Spike(0, i + t, 1.0) for t in range(num_spikes)] for i in range(4)
+    ] + [[]]
+    for sparse in [False, True]:
+        fires = simulate_episodes(net, episodes, timesteps, sparse)
+        assert fires.shape == (len(episodes), timesteps, 1)
+        for i in range(4):
+            assert np.flatnonzero(fires[i, :, 0]).tolist() == [
+                i + num_spikes - 1 + delay
+            ]
+        assert not fires[-1].any()
+
+
+def test_sim_processor() -> None:
+    proc = SimProcessor()
+    proc.load_network(net)
+    # a long quiet gap between the two input trains is skipped over
+    gap = 1_000_000
+    for start in [0, gap]:
+        proc.apply_spikes([neuro.Spike(0, start + t, 1.0) for t in range(num_spikes)])
+    proc.run(gap)
+    assert proc.output_vectors() == [[num_spikes - 1 + delay]]
+    proc.run(gap)
+    assert proc.output_vectors() == [[num_spikes - 1 + delay]]
+    assert proc.output_raster().shape == (gap, 1)
+    assert np.flatnonzero(proc.output_raster()).tolist() == [num_spikes - 1 + delay]
+    # fires are stored since the last clear, as on fpga.Processor
+    assert proc.output_array(0).tolist() == [gap + num_spikes - 1 + delay]
+    assert not proc.output_array(0).flags.writeable
+    assert proc.output_last_fires() == [float(num_spikes - 1 + delay)]
+    proc.clear_activity()
+    proc.apply_spike(neuro.Spike(0, 0, 1.0))
+    proc.run(num_spikes + delay)
+    assert proc.output_counts() == [0]
+
+
+def test_out_of_range_spikes() -> None:
+    # the largest value whose charge fits, and the first that does not
+    max_value = ((1 << (charge_width(net) - 1)) - 1) / spike_value_factor(net)
+    too_big = (1 << (charge_width(net) - 1)) / spike_value_factor(net)
+    fires = simulate_episodes(net, [[neuro.Spike(0, 0, max_value)]], delay + 2)
+    assert fires.shape == (1, delay + 2, 1)
+
+    proc = SimProcessor()
+    proc.load_network(net)
+    for value in [too_big, -too_big - 1.0]:
+        with pytest.raises(ValueError):
+            simulate_episodes(net, [[neuro.Spike(0, 0, value)]], delay + 2)
+        with pytest.raises(ValueError):
+            proc.apply_spike_arrays(0, 0, value)
+        with pytest.raises(ValueError):
+            proc.apply_spike(neuro.Spike(0, 0, value))
+    # the rejected spikes were never queued, so the processor carries on
+    proc.apply_spikes([neuro.Spike(0, t, 1.0) for t in range(num_spikes)])
+    proc.run(num_spikes + delay)
+    assert proc.output_vector(0) == [float(num_spikes - 1 + delay)]
@@ -0,0 +1,87 @@
+# Copyright (c) 2026 Keegan Dent
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import pathlib as pl
+import shutil
+
+import neuro
+import pytest
+
+import fpga
+from fpga.emulator import Emulator
+from fpga.replay import read_commands, replay
+from fpga.transport import LoopbackTransport
+from fpga.verilated import VerilatedDevice
+
+proj_path = pl.Path(__file__).parent.parent
+net = neuro.Network()
+net.read_from_file(str(proj_path / "networks" / "simple.txt"))
+
+_delay_idx = net.get_edge_property("Delay").index
+_weight_idx = net.get_edge_property("Weight").index
+_thresh_idx = net.get_node_property("Threshold").index
+
+delay = int(net.get_edge(0, 1).values[_delay_idx])
+weight = int(net.get_edge(0, 1).values[_weight_idx])
+threshold_1 = int(net.get_node(1).values[_thresh_idx])
+
+dbscan_path = proj_path / "dbscan_example"
+dbscan_net = neuro.Network()
+dbscan_net.read_from_file(str(dbscan_path / "dbscan-20-4-5.txt"))
+
+
+class _Checked:
+    """Passes bytes to both devices, insisting they respond identically."""
+
+    def __init__(self, dut: VerilatedDevice, model: Emulator):
+        self._dut = dut
+        self._model = model
+
+    def write(self, data: bytes) -> None:
+        self._dut.write(data)
+        self._model.write(data)
+        assert self._dut.output_waiting() == self._model.output_waiting()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._dut.read(size)
+        assert data == self._model.read(size)
+        return data
+
+    def output_waiting(self) -> int:
+        return self._dut.output_waiting()
+
+
+@pytest.mark.skipif(shutil.which("verilator") is None, reason="requires Verilator")
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_verilated_processor(io_type: str) -> None:
+    num_spikes = -(-threshold_1 // weight)
+    expected_fire = num_spikes - 1 + delay
+
+    device = _Checked(VerilatedDevice(net, io_type), Emulator(net, io_type))
+    proc = fpga.Processor("emulator", LoopbackTransport(device), io_type)
+    proc.load_network(net)
+    for _ in range(2):
+        proc.apply_spikes([neuro.Spike(0, i, 1.0) for i in range(num_spikes)])
+        proc.run(expected_fire + 2)
+        assert proc.output_vector(0) == [float(expected_fire)]
+    proc.clear_activity()
+    proc.apply_spikes([neuro.Spike(0, 0, 1.0)])
+    proc.run(expected_fire + 2)
+    assert proc.output_count(0) == 0
+
+
+@pytest.mark.skipif(shutil.which("verilator") is None, reason="requires Verilator")
+@pytest.mark.parametrize("io_type", ["DIDO", "DISO", "SIDO", "SISO"])
+def test_verilated_dbscan(io_type: str) -> None:
+    # every dbscan input in turn, each byte checked against the emulator
+    device = _Checked(
+        VerilatedDevice(dbscan_net, io_type), Emulator(dbscan_net, io_type)
+    )
+    proc = fpga.Processor("emulator", LoopbackTransport(device), io_type)
+    proc.load_network(dbscan_net)
+    stats = replay(proc, read_commands(dbscan_path / "input_112.txt"))
+    assert stats.timesteps == 100 * 112
+    assert sum(stats.fire_counts) > 0